@@ -67,7 +67,7 @@ export default function BuilderPage() {
       const payload = { username, profile_data: dataToUse, jd_text: jdText, pipeline: pipeline };
       const res = await axios.post(`${API_URL}/generate`, payload);
       setTypstCode(res.data.typst_code);
-      setPdfUrl(`${API_URL}/static/resume.pdf?t=${Date.now()}`);
+      if (res.data.pdf_url) setPdfUrl(`${API_URL}${res.data.pdf_url}`);
       if (res.data.analysis) setAnalysis(res.data.analysis);
     } catch (e) {
       console.error("Compile failed", e);
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import axios from 'axios';
 
 const API_URL = "https://ai-resume-production-564b.up.railway.app";
@@ -11,6 +11,7 @@ interface ResumeFormProps {
 
 export default function ResumeForm({ data, onChange, isDarkMode = true }: ResumeFormProps) {
   const [rewritingIndex, setRewritingIndex] = useState<number | null>(null);
+  const rewriteAbort = useRef<AbortController | null>(null);
 
   // ================= HANDLERS =================
   const handleChange = (field: string, value: string) => {
@@ -25,15 +26,60 @@ export default function ResumeForm({ data, onChange, isDarkMode = true }: Resume
 
   const handleRewrite = async (index: number, currentText: string) => {
     if (!currentText) return;
+    // Starting a new rewrite cancels the previous one (server stops the LLM call)
+    rewriteAbort.current?.abort();
+    const controller = new AbortController();
+    rewriteAbort.current = controller;
     setRewritingIndex(index);
     try {
-      const res = await axios.post(`${API_URL}/rewrite`, { text: currentText });
-      handleProjectChange(index, "description_raw", res.data.refined_text);
+      const res = await fetch(`${API_URL}/rewrite/stream`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ text: currentText }),
+        signal: controller.signal,
+      });
+      if (!res.ok || !res.body) {
+        // Older backends: fall back to the blocking endpoint
+        const fallback = await axios.post(`${API_URL}/rewrite`, { text: currentText });
+        handleProjectChange(index, "description_raw", fallback.data.refined_text);
+        return;
+      }
+
+      // Server-Sent Events: "event: token|done|error" + "data: {json}", blank-line separated
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let text = "";
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split("\n\n");
+        buffer = events.pop() || "";
+        for (const raw of events) {
+          const event = raw.match(/^event: (.*)$/m)?.[1];
+          const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || "{}");
+          if (event === "token") {
+            text += data.text;
+            handleProjectChange(index, "description_raw", text);
+          } else if (event === "done") {
+            handleProjectChange(index, "description_raw", data.refined_text);
+          } else if (event === "error") {
+            throw new Error(data.detail);
+          }
+        }
+      }
     } catch (error) {
-      alert("AI Rewrite failed. Check console.");
-      console.error(error);
+      if ((error as Error).name !== "AbortError") {
+        alert("AI Rewrite failed. Check console.");
+        console.error(error);
+      }
+    } finally {
+      if (rewriteAbort.current === controller) {
+        rewriteAbort.current = null;
+        setRewritingIndex(null);
+      }
     }
-    setRewritingIndex(null);
   };
 
   const addProject = () => {
@@ -0,0 +1,102 @@
+"""
+Benchmarks the section builder (src/builder.py) on large profiles:
+- cold:   fragment caches empty (first render of a profile),
+- warm:   same profile again (every fragment is a cache hit),
+- edit:   one project changed (only its fragment re-renders),
+- reorder: a different section_order (fragments reused as-is).
+Ranked runs include order_projects; "unranked" isolates the builder.
+Keep --projects below BUILDER_FRAGMENT_CACHE_SIZE or the LRU thrashes.
+
+    uv run python scripts/bench_builder.py [--projects 500] [--jobs 50] [--runs 20]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.append(os.getcwd())
+
+from src.builder import build_typst_code, clear_fragment_cache, fragment_cache_stats
+
+
+def make_profile(n_projects: int, n_jobs: int, seed: int = 7) -> dict:
+    rnd = random.Random(seed)
+    words = ["scalable", "API", "Kubernetes", "latency", "#hashtag", "C#", "$5k", "@team", "pipeline", "React"]
+
+    def sentence(n=14):
+        return " ".join(rnd.choice(words) for _ in range(n))
+
+    return {
+        "full_name": "bench user",
+        "github_username": "bench",
+        "email": "bench@example.com",
+        "bio": sentence(40),
+        "skills": [f"Skill {i}" for i in range(60)],
+        "experience": [
+            {"company": f"Company {i}", "role": "Engineer", "start_date": "2020", "end_date": "2022",
+             "raw_responsibilities": "\n".join(sentence() for _ in range(4))}
+            for i in range(n_jobs)
+        ],
+        "education": [{"institution": "University", "degree": "BSc", "start_date": "2014", "end_date": "2018"}],
+        "projects": [
+            {"name": f"project-{i}", "tech_stack": ["Python", "Docker", "Go"],
+             "refined_bullets": [sentence() for _ in range(3)]}
+            for i in range(n_projects)
+        ],
+    }
+
+
+def timed(fn, runs: int, setup=None) -> float:
+    """Median ms over `runs` calls; setup() runs untimed before each call."""
+    samples = []
+    for _ in range(runs):
+        if setup: setup()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    profile = make_profile(args.projects, args.jobs)
+    analysis = {"suggested_project_order": [f"project-{i}" for i in range(0, args.projects, 7)]}
+    reordered = ["skills", "projects", "experience", "education", "summary"]
+    print(f"📄 {args.projects} projects, {args.jobs} jobs, "
+          f"{len(build_typst_code(profile, analysis)) / 1024:.0f} KiB of Typst\n")
+
+    cold = timed(lambda: build_typst_code(profile, analysis), args.runs, setup=clear_fragment_cache)
+
+    build_typst_code(profile, analysis)
+    warm = timed(lambda: build_typst_code(profile, analysis), args.runs)
+
+    counter = iter(range(10 ** 9))
+
+    def edit_one():
+        profile["projects"][0]["refined_bullets"][0] = f"Edited bullet {next(counter)}"
+
+    edit = timed(lambda: build_typst_code(profile, analysis), args.runs, setup=edit_one)
+    reorder = timed(lambda: build_typst_code(profile, analysis, section_order=reordered), args.runs)
+    cold_unranked = timed(lambda: build_typst_code(profile), args.runs, setup=clear_fragment_cache)
+    build_typst_code(profile)
+    warm_unranked = timed(lambda: build_typst_code(profile), args.runs)
+
+    rows = (("cold", cold), ("warm", warm), ("edit one project", edit), ("reorder sections", reorder),
+            ("cold, unranked", cold_unranked), ("warm, unranked", warm_unranked))
+    for label, ms in rows:
+        print(f"   {label:<18} {ms:8.2f} ms  ({cold / ms:5.1f}x vs cold)")
+
+    projects = fragment_cache_stats()["projects"]
+    print(f"\n📊 Project fragments: {projects['hits']} hits, {projects['misses']} misses, {projects['currsize']} cached")
+
+
+if __name__ == "__main__":
+    main()
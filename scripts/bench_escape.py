@@ -0,0 +1,89 @@
+"""
+Throughput of builder.escape_typst (table-driven str.replace, only for
+characters present) against a single str.translate pass and a regex
+substitution doing the same escaping, plus the old four-replace escaper
+it replaced (which missed most of the markup specials).
+
+    uv run python scripts/bench_escape.py [--strings 20000] [--runs 5]
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.append(os.getcwd())
+
+from src.builder import escape_typst, TYPST_MARKUP_SPECIALS
+
+
+def legacy_escape(text: str) -> str:
+    """The previous escaper: four passes, @ # $ and " only."""
+    text = text.replace("@", "\\@")
+    text = text.replace("#", "\\#")
+    text = text.replace("$", "\\$")
+    text = text.replace('"', '\\"')
+    return text
+
+
+_TRANSLATE_MARKUP = str.maketrans({c: "\\" + c for c in TYPST_MARKUP_SPECIALS})
+
+
+def translate_markup(text: str) -> str:
+    return text.translate(_TRANSLATE_MARKUP)
+
+
+_SPECIALS = re.compile("[" + re.escape(TYPST_MARKUP_SPECIALS) + "]")
+
+
+def regex_markup(text: str) -> str:
+    return _SPECIALS.sub(lambda m: "\\" + m.group(0), text)
+
+
+def corpus(n: int, seed: int = 3) -> list:
+    """Resume-like bullets with the occasional special character."""
+    rnd = random.Random(seed)
+    words = ["Built", "a", "scalable", "REST", "API", "in", "Go", "reducing", "latency", "by", "40%",
+             "C#", "$2M", "@scale", "_internal_", "*core*", "e.g.", "CI/CD", "<3", "[WIP]", "don't", "\"fast\""]
+    return [" ".join(rnd.choice(words) for _ in range(rnd.randint(8, 30))) for _ in range(n)]
+
+
+def throughput(fn, texts: list, runs: int) -> float:
+    """Best-of-runs MB/s over the corpus."""
+    size_mb = sum(len(t.encode("utf-8")) for t in texts) / 1e6
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        for t in texts:
+            fn(t)
+        best = min(best, time.perf_counter() - start)
+    return size_mb / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Typst escaper")
+    parser.add_argument("--strings", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    texts = corpus(args.strings)
+
+    # Same output, different mechanics
+    for t in texts[:500]:
+        assert translate_markup(t) == regex_markup(t) == escape_typst(t, "markup")
+
+    rows = [
+        ("escape_typst (string)", lambda t: escape_typst(t)),
+        ("escape_typst (markup)", lambda t: escape_typst(t, "markup")),
+        ("str.translate (one pass, markup)", translate_markup),
+        ("regex sub", regex_markup),
+        ("legacy (4 passes, incomplete)", legacy_escape),
+    ]
+    print(f"📄 {len(texts)} strings, {sum(map(len, texts)) / 1e6:.1f} M chars\n")
+    for label, fn in rows:
+        print(f"   {label:<32} {throughput(fn, texts, args.runs):8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
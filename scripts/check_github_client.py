@@ -0,0 +1,154 @@
+"""
+Exercises the GitHub client against a local stand-in for the GitHub API:
+conditional requests (ETag / Last-Modified -> 304), lazy pagination and
+per-repo tech_stack enrichment.
+
+    uv run python scripts/check_github_client.py
+"""
+
+import os
+import sys
+import json
+import base64
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+sys.path.append(os.getcwd())
+
+from src.github_client import GitHubClient, ConditionalCache, GitHubNotFound
+from src.repo_enrichment import EnrichmentCache, enrich_repos, tech_stack_for
+
+USERNAME = "octo"
+REPOS = [
+    {"name": f"repo-{i}", "full_name": f"octo/repo-{i}", "html_url": f"https://github.com/octo/repo-{i}",
+     "fork": i % 7 == 0, "stargazers_count": (i * 37) % 101, "description": None, "language": "Python",
+     "topics": ["cli"], "pushed_at": "2025-01-01T00:00:00Z"}
+    for i in range(250)
+]
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+hits = []
+
+
+class FakeGitHub(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, payload, etag, extra_headers=None):
+        if self.headers.get("If-None-Match") == etag or self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+            hits.append((self.path, 304))
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        hits.append((self.path, 200))
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == f"/users/{USERNAME}":
+            self._send({"login": USERNAME, "name": "Octo Cat", "public_repos": len(REPOS)}, '"user-v1"')
+        elif url.path == f"/users/{USERNAME}/repos":
+            query = parse_qs(url.query)
+            per_page = int(query.get("per_page", ["30"])[0])
+            page = int(query.get("page", ["1"])[0])
+            chunk = REPOS[(page - 1) * per_page: page * per_page]
+            headers = {}
+            if page * per_page < len(REPOS):
+                base = f"http://{self.headers['Host']}/users/{USERNAME}/repos"
+                headers["Link"] = f'<{base}?sort=pushed&per_page={per_page}&page={page + 1}>; rel="next"'
+            self._send(chunk, f'"repos-{per_page}-{page}"', headers)
+        elif url.path.startswith(f"/repos/{USERNAME}/") and url.path.endswith("/languages"):
+            self._send({"Python": 9000, "Dockerfile": 800, "Shell": 10}, f'"{url.path}"')
+        elif url.path.startswith(f"/repos/{USERNAME}/") and url.path.endswith("/contents/requirements.txt"):
+            content = base64.b64encode(b"fastapi>=0.100\npandas\n# comment\n").decode()
+            self._send({"encoding": "base64", "content": content}, f'"{url.path}"')
+        else:
+            hits.append((self.path, 404))
+            self.send_response(404)
+            self.end_headers()
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = GitHubClient(base_url=base_url, token=None,
+                              cache=ConditionalCache(os.path.join(tmp, "github_cache.db")))
+
+        # 1. Lazy pagination: taking 150 repos must not request page 3
+        taken = [r["name"] for _, r in zip(range(150), client.iter_repos(USERNAME))]
+        assert taken == [r["name"] for r in REPOS[:150]], "pagination returned the wrong repos"
+        assert [p for p, _ in hits] == [
+            f"/users/{USERNAME}/repos?sort=pushed&per_page=100",
+            f"/users/{USERNAME}/repos?sort=pushed&per_page=100&page=2",
+        ], f"unexpected requests: {hits}"
+        print("✅ Lazy pagination stops after the pages it needs")
+
+        # 2. Conditional requests: the second read is a 304 served from cache
+        hits.clear()
+        first = client.get_user(USERNAME)
+        second = client.get_user(USERNAME)
+        assert first == second
+        assert [s for _, s in hits] == [200, 304], f"expected 200 then 304, got {hits}"
+        stats = client.stats()
+        assert stats["not_modified"] == 1, stats
+        print("✅ Unchanged data costs a 304")
+
+        # 3. Cached pages keep their next links across a 304
+        hits.clear()
+        again = [r["name"] for r in client.iter_repos(USERNAME)]
+        assert again == [r["name"] for r in REPOS]
+        assert [s for _, s in hits] == [304, 304, 200], f"unexpected statuses: {hits}"
+        print("✅ 304 pages still paginate")
+
+        # 4. The cache outlives the client (new process, same db)
+        hits.clear()
+        fresh = GitHubClient(base_url=base_url, token=None,
+                             cache=ConditionalCache(os.path.join(tmp, "github_cache.db")))
+        fresh.get_user(USERNAME)
+        assert hits == [(f"/users/{USERNAME}", 304)], hits
+        print("✅ ETags persist across restarts")
+
+        try:
+            client.get_user("nobody")
+            raise AssertionError("expected GitHubNotFound")
+        except GitHubNotFound:
+            print("✅ Unknown users raise GitHubNotFound")
+
+        # 5. Enrichment: cached per pushed_at, so only changed repos are re-queried
+        enrich_cache = EnrichmentCache(os.path.join(tmp, "github_cache.db"))
+        repos = [dict(r) for r in REPOS[1:4]]
+        hits.clear()
+        result = enrich_repos(repos, detect_frameworks=True, client=client, cache=enrich_cache)
+        stack = tech_stack_for(repos[0], result[repos[0]["full_name"]])
+        assert stack == ["Python", "Dockerfile", "FastAPI", "Pandas", "cli"], stack
+        assert sum(p.endswith("/languages") for p, _ in hits) == 3, hits
+        hits.clear()
+        enrich_repos(repos, detect_frameworks=True, client=client, cache=enrich_cache)
+        assert hits == [], f"unchanged repos were re-queried: {hits}"
+        repos[1]["pushed_at"] = "2025-02-01T00:00:00Z"
+        enrich_repos(repos, detect_frameworks=True, client=client, cache=enrich_cache)
+        assert {p.split("/")[3] for p, _ in hits} == {"repo-2"}, hits
+        print("✅ Enrichment only re-queries repos pushed since the last fetch")
+
+        client.close()
+        fresh.close()
+    server.shutdown()
+    print("\n🎉 All GitHub client checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Property-based fuzz test for builder.escape_typst, round-tripped through
+the Typst compiler (needs the `typst` package):
+1. string context: "<escaped>" evaluates back to exactly the input;
+2. markup context: [<escaped>] is plain text equal to the input (up to
+   whitespace, which markup collapses) - no strong/emph/raw/links/math,
+   smart quotes or shorthands;
+3. build_typst_code on profiles made of random strings compiles.
+Failing inputs are shrunk to a minimal example before being reported.
+
+    uv run python scripts/fuzz_escape.py [--cases 2000] [--seed 0]
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+from typing import Callable, List, Optional
+
+sys.path.append(os.getcwd())
+
+import typst
+
+from src.builder import escape_typst, build_typst_code, TYPST_MARKUP_SPECIALS
+
+# Weighted toward characters that mean something to Typst
+ALPHABET = (
+    TYPST_MARKUP_SPECIALS * 4
+    + "{}()%&^!?:;,|\n\t\r  "
+    + "abcxyzABC0123456789"
+    + "é漢🚀ß–"
+)
+BATCH = 100
+
+
+def random_text(rnd: random.Random, max_len: int = 40) -> str:
+    text = "".join(rnd.choice(ALPHABET) for _ in range(rnd.randint(0, max_len)))
+    # Typical failure shapes: line-start markers, URLs, escapes, shorthands
+    if rnd.random() < 0.2:
+        text = rnd.choice(["= ", "- ", "+ ", "/ t: ", "1. ", "https://x.io/", "\\u{41}", "...", "---", "// "]) + text
+    return text
+
+
+def plain_text(node) -> str:
+    """Flattens queried content; anything but text/space becomes a visible marker."""
+    if isinstance(node, str):
+        return node
+    func = node.get("func")
+    if func in ("text", "symbol"):
+        return node["text"]
+    if func in ("space", "parbreak"):
+        return " "
+    if func == "sequence":
+        return "".join(plain_text(child) for child in node["children"])
+    return f"<{func}>"
+
+
+def squash(text: str) -> str:
+    return " ".join(text.split())
+
+
+def round_trip(texts: List[str]) -> List[Optional[str]]:
+    """Per input: None if both contexts round-trip, else what went wrong."""
+    strings = "".join(f'"{escape_typst(t)}", ' for t in texts)
+    markup = "".join(f"[{escape_typst(t, 'markup')}], " for t in texts)
+    source = f"#metadata(({strings})) <strings>\n#metadata(({markup})) <markup>\n".encode("utf-8")
+    try:
+        got_strings = json.loads(typst.query(source, "<strings>", field="value", one=True))
+        got_markup = json.loads(typst.query(source, "<markup>", field="value", one=True))
+    except Exception as e:
+        if len(texts) == 1:
+            return [f"compile error: {e}"]
+        # Split the batch to find the culprit(s)
+        mid = len(texts) // 2
+        return round_trip(texts[:mid]) + round_trip(texts[mid:])
+
+    problems = []
+    for text, s, m in zip(texts, got_strings, got_markup):
+        if s != text:
+            problems.append(f"string context gave {s!r}")
+        elif squash(plain_text(m)) != squash(text):
+            problems.append(f"markup context gave {plain_text(m)!r}")
+        else:
+            problems.append(None)
+    return problems
+
+
+def shrink(text: str, fails: Callable[[str], bool]) -> str:
+    """Greedy delta debugging: drop chunks, then single characters, while it still fails."""
+    chunk = max(len(text) // 2, 1)
+    while chunk >= 1:
+        i = 0
+        while i < len(text):
+            candidate = text[:i] + text[i + chunk:]
+            if candidate != text and fails(candidate):
+                text = candidate
+            else:
+                i += chunk
+        chunk //= 2
+    return text
+
+
+def random_profile(rnd: random.Random) -> dict:
+    return {
+        "full_name": random_text(rnd) or "x",
+        "github_username": random_text(rnd, 12),
+        "email": random_text(rnd, 20),
+        "bio": random_text(rnd, 120),
+        "skills": [random_text(rnd, 10) for _ in range(rnd.randint(0, 5))],
+        "experience": [
+            {"company": random_text(rnd, 15), "role": random_text(rnd, 15), "start_date": random_text(rnd, 6),
+             "raw_responsibilities": random_text(rnd, 80)}
+            for _ in range(rnd.randint(0, 2))
+        ],
+        "education": [{"institution": random_text(rnd, 15), "degree": random_text(rnd, 10),
+                       "details": random_text(rnd, 20)}] if rnd.random() < 0.5 else [],
+        "projects": [
+            {"name": random_text(rnd, 15) + str(i), "tech_stack": [random_text(rnd, 8)],
+             "refined_bullets": [random_text(rnd, 60) for _ in range(rnd.randint(1, 3))]}
+            for i in range(rnd.randint(0, 4))
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzz the Typst escaper against the compiler")
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--profiles", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rnd = random.Random(args.seed)
+
+    # 1 + 2. Escaper round trips
+    failures = []
+    texts = [random_text(rnd) for _ in range(args.cases)]
+    for start in range(0, len(texts), BATCH):
+        batch = texts[start:start + BATCH]
+        for text, problem in zip(batch, round_trip(batch)):
+            if problem:
+                failures.append((text, problem))
+    reported = set()
+    for text, problem in failures[:20]:
+        minimal = shrink(text, lambda t: round_trip([t])[0] is not None)
+        if minimal not in reported and len(reported) < 5:
+            reported.add(minimal)
+            print(f"❌ {minimal!r}: {round_trip([minimal])[0]}")
+    if failures:
+        sys.exit(f"{len(failures)}/{len(texts)} inputs did not round-trip")
+    print(f"✅ {len(texts)} random strings round-trip in string and markup context")
+
+    # 3. Whole documents
+    compiler = typst.Compiler()
+    for n in range(args.profiles):
+        profile = random_profile(rnd)
+        try:
+            compiler.compile(input=build_typst_code(profile).encode("utf-8"))
+        except Exception as e:
+            sys.exit(f"❌ Profile #{n} failed to compile: {e}\n{json.dumps(profile, ensure_ascii=False)}")
+    print(f"✅ {args.profiles} random profiles compile with build_typst_code")
+    print("\n🎉 Escaper fuzzing passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-import os
 import json
 import sys
 import re
@@ -12,9 +11,15 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 try:
     from src.tools import generate_resume_pdf, save_refined_profile
     from src.gap_analyzer import analyze_job_match
+    from src.profile_store import get_profile_store
+    from src.schemas import needs_refinement, mark_refined
+    from src.builder import rank_projects, escape_typst
 except ModuleNotFoundError:
     from tools import generate_resume_pdf, save_refined_profile
     from gap_analyzer import analyze_job_match
+    from profile_store import get_profile_store
+    from schemas import needs_refinement, mark_refined
+    from builder import rank_projects, escape_typst
 
 load_dotenv()
 
@@ -61,12 +66,12 @@ def load_profile_node(state: AgentState):
     if state.get("profile_data"): return {} 
     
     username = state.get("username")
-    path = f"data/github/{username}.json"
+    store = get_profile_store()
     
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Could not find profile at: {path}")
-        
-    with open(path, "r") as f: data = json.load(f)
+    # Private copy: the refiner edits projects in place
+    data = store.get(username, copy_data=True)
+    if data is None:
+        raise FileNotFoundError(f"Could not find profile at: {store.location(username)}")
     print(f"\n[SYSTEM]  Loaded profile for: {data.get('full_name')} (@{username})")
     
     new_state = {
@@ -91,8 +96,8 @@ def refinement_check_node(state: AgentState):
     
     current_project = projects[idx]
     
-    # Skip logic
-    if current_project.get("is_refined", False) or current_project.get("name") in processed:
+    # Skip logic: bullets already match the project's current inputs
+    if not needs_refinement(current_project) or current_project.get("name") in processed:
         return {"next_step": "skip", "current_project_index": idx + 1}
         
     print(f"\n AI INTERVIEW: {current_project.get('name')}")
@@ -108,20 +113,20 @@ def update_profile_node(state: AgentState):
     
     if user_metrics.lower() in ["skip", "no", "next"]:
         print(f"  Skipping refinement.")
-        project["is_refined"] = True
-        project["refined_bullets"] = [project.get("description_raw", "")]
+        mark_refined(project, [project.get("description_raw", "")])
         processed.append(project.get("name"))
     else:
         print("  Rewriting bullets...")
+        # Keep the interview answer: it's one of the refinement inputs
+        project["metrics_raw"] = user_metrics
         prompt = f"Project: {project['name']}\nMetrics: {user_metrics}\nWrite 2 bullet points (XYZ format). JSON list only."
         try:
             res = llm.invoke(prompt)
             new_bullets = json.loads(res.content.replace("```json","").replace("```","").strip())
-            project["refined_bullets"] = new_bullets
         except:
-            project["refined_bullets"] = [project.get("description_raw")]
+            new_bullets = [project.get("description_raw")]
         
-        project["is_refined"] = True
+        mark_refined(project, new_bullets)
         processed.append(project.get("name"))
         print(" Saved.")
 
@@ -131,13 +136,12 @@ def update_profile_node(state: AgentState):
 def analysis_node(state: AgentState):
     print("\n Running Gap Analysis...")
     jd = state.get("jd_text", "")
-    username = state["username"]
     
     if not jd or len(jd) < 5:
         print("  No JD found. Skipping analysis.")
         return {"next_step": "generate", "analysis_result": {}}
         
-    result = analyze_job_match(f"data/github/{username}.json", jd)
+    result = analyze_job_match(state["profile_data"], jd)
     if result:
         print(f" Match Score: {result.get('match_score')}/100")
         print(f" Suggestion: {result.get('critique')}")
@@ -147,6 +151,7 @@ def generation_node(state: AgentState):
     print("\n Generating Resume PDF (Safe Mode)...")
     profile = state["profile_data"]
     analysis = state.get("analysis_result", {})
+    github_user = profile.get('github_username', '')
     
     # --- 1. SETUP STATIC TYPST HEADER (Error-Free) ---
     typst_code = f"""
@@ -154,7 +159,7 @@ def generation_node(state: AgentState):
       paper: "us-letter",
       margin: (x: 1.5cm, y: 1.5cm),
     )
-    #set text(font: "Linux Libertine", size: 11pt)
+    #set text(font: "Libertinus Serif", size: 11pt)
     
     // Define the Project Item function once
     #let project_item(name, tech, bullets) = {{
@@ -170,14 +175,14 @@ def generation_node(state: AgentState):
     
     // --- HEADER ---
     #align(center)[
-      #text(size: 17pt, weight: "bold")[{profile.get('full_name', 'Your Name')}] \
-      #link("https://github.com/{profile.get('github_username', '')}")[github.com/{profile.get('github_username', '')}] | {profile.get('email', '')}
+      #text(size: 17pt, weight: "bold")[{escape_typst(profile.get('full_name', 'Your Name'), "markup")}] \
+      #link("https://github.com/{escape_typst(github_user)}")[github.com/{escape_typst(github_user, "markup")}] | {escape_typst(profile.get('email', ''), "markup")}
       #line(length: 100%, stroke: 1pt + gray)
     ]
     
     // --- SUMMARY ---
     == Summary
-    {profile.get('bio', 'Experienced Software Engineer...')}
+    {escape_typst(profile.get('bio', 'Experienced Software Engineer...'), "markup")}
     """
     
     # --- 2. GENERATE EXPERIENCE SECTION ---
@@ -185,16 +190,17 @@ def generation_node(state: AgentState):
         typst_code += "\n== Experience\n"
         for exp in profile.get('experience', []):
             # Escape strings to prevent crashes
-            role = exp.get('role', 'Role').replace('"', '\\"')
-            company = exp.get('company', 'Company').replace('"', '\\"')
-            desc = exp.get('raw_responsibilities', '').replace('"', '\\"')
+            role = escape_typst(exp.get('role', 'Role'), "markup")
+            company = escape_typst(exp.get('company', 'Company'), "markup")
+            desc = escape_typst(exp.get('raw_responsibilities', ''), "markup")
+            dates = escape_typst(f"{exp.get('start_date')} - {exp.get('end_date')}", "markup")
             
             typst_code += f"""
             #block(below: 1em)[
               #grid(
                 columns: (1fr, auto),
                 [* {company} *],
-                [{exp.get('start_date')} - {exp.get('end_date')}]
+                [{dates}]
               )
               _{role}_ \
               {desc}
@@ -204,26 +210,11 @@ def generation_node(state: AgentState):
     # --- 3. GENERATE PROJECTS SECTION (Tailored via Python) ---
     typst_code += "\n== Projects\n"
     
-    # Sort projects based on AI Analysis
+    # Sort projects based on AI Analysis (suggested names resolved against the profile)
     projects = profile.get('projects', [])
-    suggested_order = analysis.get("suggested_project_order", [])
-    
-    # Create a map for easy lookup
-    project_map = {p['name']: p for p in projects}
-    ordered_projects = []
-    
-    # 3a. Add AI-suggested projects first
-    for name in suggested_order:
-        # Fuzzy match to find the project
-        for p_name, p_data in project_map.items():
-            if name.lower() in p_name.lower():
-                ordered_projects.append(p_data)
-                # Remove from map so we don't add it twice
-                if p_name in project_map: del project_map[p_name]
-                break
-            
-    # 3b. Add remaining projects
-    ordered_projects.extend(project_map.values())
+    ordered_projects, unmatched = rank_projects(projects, analysis)
+    if unmatched:
+        print(f"⚠️ Suggested projects not found in profile: {unmatched}")
 
     # 3c. Write the Typst calls using Python (Safe!)
     for p in ordered_projects:
@@ -235,13 +226,13 @@ def generation_node(state: AgentState):
         # Format bullets into a Typst array string: ("Point 1", "Point 2")
         bullet_list_str = ""
         for b in bullets:
-            # CRITICAL: Escape double quotes in text
-            clean_b = b.replace('"', '\\"') 
+            # CRITICAL: Escape for a Typst string literal
+            clean_b = escape_typst(b)
             bullet_list_str += f'"{clean_b}", '
             
         # Clean tech stack
-        tech_str = ", ".join(p.get('tech_stack', [])).replace('"', '\\"')
-        name_str = p.get('name', '').replace('"', '\\"')
+        tech_str = escape_typst(", ".join(p.get('tech_stack', [])))
+        name_str = escape_typst(p.get('name', ''))
 
         # Inject valid Typst function call
         typst_code += f'#project_item("{name_str}", "{tech_str}", ({bullet_list_str}))\n'
@@ -0,0 +1,182 @@
+"""
+Persistent cache for gap-analysis results.
+Keyed on a normalized fingerprint of the project summaries and the
+truncated job description, so re-tailoring for the same posting skips
+the LLM call. Stored in SQLite next to users.db.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Any, List, Optional
+
+# ==================== CONFIG ====================
+DATABASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "analysis_cache.db")
+CACHE_TTL_S = float(os.getenv("ANALYSIS_CACHE_TTL", str(7 * 24 * 3600)))
+CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "2000"))
+# Bump when the prompt changes so old answers aren't reused
+PROMPT_VERSION = "v1"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def analysis_fingerprint(project_summaries: List[str], jd_text: str, model: str = "") -> str:
+    """
+    Project order and whitespace/case differences don't change the answer,
+    so they don't change the key either.
+    """
+    h = hashlib.sha256()
+    h.update(f"{PROMPT_VERSION}|{model}".encode("utf-8"))
+    for summary in sorted(_normalize(s) for s in project_summaries):
+        h.update(b"\0")
+        h.update(summary.encode("utf-8"))
+    h.update(b"\1")
+    h.update(_normalize(jd_text).encode("utf-8"))
+    return h.hexdigest()
+
+
+class AnalysisCache:
+    def __init__(self, db_path: str = DATABASE_PATH, ttl_s: float = CACHE_TTL_S,
+                 max_entries: int = CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+        self._init_db()
+
+    # ==================== DATABASE ====================
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_cache (
+                    key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_last_access ON analysis_cache (last_access)")
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ==================== PUBLIC API ====================
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT result, created_at FROM analysis_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                with self._lock:
+                    self._misses += 1
+                return None
+
+            if now - row["created_at"] > self.ttl_s:
+                conn.execute("DELETE FROM analysis_cache WHERE key = ?", (key,))
+                conn.commit()
+                with self._lock:
+                    self._misses += 1
+                    self._expired += 1
+                return None
+
+            conn.execute(
+                "UPDATE analysis_cache SET last_access = ?, hits = hits + 1 WHERE key = ?",
+                (now, key),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        with self._lock:
+            self._hits += 1
+        return json.loads(row["result"])
+
+    def put(self, key: str, result: Dict[str, Any]):
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache (key, result, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(result), now, now),
+            )
+            # LRU: trim the least recently used rows beyond the cap
+            cursor = conn.execute(
+                """
+                DELETE FROM analysis_cache WHERE key IN (
+                    SELECT key FROM analysis_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+            conn.commit()
+            evicted = cursor.rowcount
+        finally:
+            conn.close()
+
+        if evicted > 0:
+            with self._lock:
+                self._evictions += evicted
+
+    def purge_expired(self) -> int:
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "DELETE FROM analysis_cache WHERE created_at < ?", (time.time() - self.ttl_s,)
+            )
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._connect()
+        try:
+            entries = conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+        finally:
+            conn.close()
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "expired": self._expired,
+                "evictions": self._evictions,
+                "entries": entries,
+            }
+
+
+# ==================== SHARED INSTANCE ====================
+_cache: Optional[AnalysisCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnalysisCache()
+        return _cache
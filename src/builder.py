@@ -1,42 +1,78 @@
+import os
 import json
+from functools import lru_cache
 
-def escape_typst(text: str) -> str:
+try:
+    from src.project_resolver import resolve_project_order
+except ModuleNotFoundError:
+    from project_resolver import resolve_project_order
+
+# Sections a resume can contain, in PipelineConfig's default order
+SECTION_ORDER = ["summary", "experience", "projects", "education", "skills"]
+# Rendered fragments (header, summary, one per project / job / school) kept in memory
+FRAGMENT_CACHE_SIZE = int(os.getenv("BUILDER_FRAGMENT_CACHE_SIZE", "4096"))
+
+# ==================== ESCAPING ====================
+# One table of (character, escaped form) per context:
+# - "string": inside a "..." literal, where only \\ " and control
+#   characters are special (other backslash sequences stay literal).
+# - "markup": content text, where every character with a meaning in
+#   Typst markup (#code, $math$, *strong*, _emph_, `raw`, <label>,
+#   @ref, [content], ~, headings, lists, --/.../' shorthands, //
+#   comments) is backslash-escaped.
+# Only characters present in the text are replaced. In CPython this beats
+# str.translate, which falls back to a per-character loop once a
+# replacement is longer than one character (see scripts/bench_escape.py).
+# The backslash goes first so inserted escapes aren't escaped again.
+TYPST_MARKUP_SPECIALS = "\\#$*_`<>@[]~=-+/.'\""
+_ESCAPE_TABLES = {
+    "string": (("\\", "\\\\"), ('"', '\\"'), ("\n", "\\n"), ("\r", "\\r"), ("\t", "\\t")),
+    "markup": tuple((c, "\\" + c) for c in TYPST_MARKUP_SPECIALS),
+}
+
+def escape_typst(text: str, context: str = "string") -> str:
     """
-    Escapes special Typst characters to prevent syntax errors.
+    Escapes user text for Typst source: context="string" inside "..."
+    literals, context="markup" for text placed directly in content.
     """
     if not text: return ""
     text = str(text) # Ensure it's a string
-    text = text.replace("@", "\\@")
-    text = text.replace("#", "\\#")
-    text = text.replace("$", "\\$")
-    text = text.replace('"', '\\"')
+    for char, escaped in _ESCAPE_TABLES[context]:
+        if char in text:
+            text = text.replace(char, escaped)
     return text
 
-def build_typst_code(profile: dict, analysis: dict = None, template_name: str="modern") -> str:
-    if analysis is None: analysis = {}
-    
-    # --- DATA PREPARATION ---
-    raw_name = profile.get('full_name') or profile.get('name') or "Your Name"
-    display_name = escape_typst(raw_name.title())
-    
-    raw_email = profile.get('email', "email@example.com")
-    if "not public" in raw_email.lower(): raw_email = "your.email@example.com"
-    email = escape_typst(raw_email)
-    
-    github_user = escape_typst(profile.get('github_username', 'github'))
-    
-    # --- HEADER ---
-    typst_code = f"""
+def as_list(value) -> list:
+    """A list of non-empty lines from a list, or from a (possibly multi-line) string."""
+    if not value: return []
+    if isinstance(value, str):
+        # Split by newlines if the user typed multiple lines in the text box
+        return [line.strip() for line in value.split('\n') if line.strip()]
+    return [str(v) for v in value]
+
+def date_range(entry: dict) -> str:
+    start, end = entry.get('start_date') or "", entry.get('end_date') or ""
+    return f"{start} - {end}" if start and end else start or end
+
+# ==================== FRAGMENTS ====================
+# Each fragment is memoized on exactly the data it shows, so rebuilding a
+# resume only re-renders the pieces whose data changed.
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _header_fragment(display_name: str, github_user: str, email: str) -> str:
+    name, email = escape_typst(display_name, "markup"), escape_typst(email, "markup")
+    github_url, github_text = escape_typst(github_user), escape_typst(github_user, "markup")
+    return f"""
     #set page(
       paper: "us-letter",
       margin: (x: 1.5cm, y: 1.5cm),
     )
-    #set text(font: "Linux Libertine", size: 11pt)
+    #set text(font: "Libertinus Serif", size: 11pt)
     
     // Header
     #align(center)[
-      #text(size: 17pt, weight: "bold")[{display_name}] \
-      #link("https://github.com/{github_user}")[github.com/{github_user}] | {email}
+      #text(size: 17pt, weight: "bold")[{name}] \
+      #link("https://github.com/{github_url}")[github.com/{github_text}] | {email}
       #line(length: 100%, stroke: 1pt + gray)
     ]
     
@@ -52,63 +88,230 @@ def build_typst_code(profile: dict, analysis: dict = None, template_name: str="m
       ]
     }}
     
-    // --- SUMMARY ---
+"""
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _summary_fragment(bio: str) -> str:
+    return f"""    // --- SUMMARY ---
     == Summary
-    {escape_typst(profile.get('bio', 'Aspiring Software Engineer...'))}
+    {escape_typst(bio, "markup")}
     """
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _project_fragment(name: str, tech: str, bullets: tuple) -> str:
+    # Trailing commas: ("x") would be a string, not a one-item array
+    bullet_str = "".join(f'"{escape_typst(b)}", ' for b in bullets)
+    return f'#project_item("{escape_typst(name)}", "{escape_typst(tech)}", ({bullet_str}))\n'
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _experience_fragment(role: str, company: str, dates: str, bullets: tuple) -> str:
+    bullet_str = "".join(f'"{escape_typst(b)}", ' for b in bullets)
+    return f'#experience_item("{escape_typst(role)}", "{escape_typst(company)}", "{escape_typst(dates)}", ({bullet_str}))\n'
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _education_fragment(institution: str, degree: str, dates: str, details: str) -> str:
+    return (f'#education_item("{escape_typst(institution)}", "{escape_typst(degree)}", '
+            f'"{escape_typst(dates)}", "{escape_typst(details)}")\n')
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _skills_fragment(skills: tuple) -> str:
+    return "\n== Skills\n" + ", ".join(escape_typst(s, "markup") for s in skills) + "\n"
+
+EXPERIENCE_HEADING = """
+== Experience
+#let experience_item(role, company, dates, bullets) = {
+  block(below: 1em)[
+    #grid(
+      columns: (1fr, auto),
+      [*#company*],
+      [#dates]
+    )
+    #text(style: "italic")[#role] \\
+    #for b in bullets [ - #b \\ ]
+  ]
+}
+"""
+
+EDUCATION_HEADING = """
+== Education
+#let education_item(institution, degree, dates, details) = {
+  block(below: 1em)[
+    #grid(
+      columns: (1fr, auto),
+      [*#institution*],
+      [#dates]
+    )
+    #degree #if details != "" [ \\ #text(style: "italic")[#details] ]
+  ]
+}
+"""
+
+def fragment_cache_stats() -> dict:
+    """Hits/misses/size per fragment cache (for benchmarks and /metrics)."""
+    caches = {
+        "header": _header_fragment, "summary": _summary_fragment, "projects": _project_fragment,
+        "experience": _experience_fragment, "education": _education_fragment, "skills": _skills_fragment,
+    }
+    return {name: fn.cache_info()._asdict() for name, fn in caches.items()}
+
+def clear_fragment_cache():
+    for fn in (_header_fragment, _summary_fragment, _project_fragment,
+               _experience_fragment, _education_fragment, _skills_fragment):
+        fn.cache_clear()
+
+# ==================== SECTIONS ====================
+def _header_block(profile: dict) -> str:
+    # --- DATA PREPARATION ---
+    raw_name = profile.get('full_name') or profile.get('name') or "Your Name"
+    raw_email = profile.get('email', "email@example.com")
+    if "not public" in raw_email.lower(): raw_email = "your.email@example.com"
+    return _header_fragment(raw_name.title(), profile.get('github_username', 'github') or "", raw_email or "")
+
+def build_summary_section(profile: dict) -> str:
+    # No bio, no section - same as the templates
+    bio = str(profile.get('bio') or "").strip()
+    if not bio: return ""
+    return _summary_fragment(bio)
+
+def order_projects(projects: list, analysis: dict = None) -> list:
+    """Puts the analysis' suggested projects first, the rest in original order."""
+    return rank_projects(projects, analysis)[0]
+
+def rank_projects(projects: list, analysis: dict = None) -> tuple:
+    """(ordered projects, suggested names that matched no project)"""
+    if analysis is None: analysis = {}
+    suggested_order = analysis.get("suggested_project_order") or []
+    return resolve_project_order(projects, suggested_order)
+
+def project_tech(p: dict) -> str:
+    """The tech stack line for a project ('' if none)."""
+    stack = p.get('tech_stack', [])
+    if isinstance(stack, str): stack = [stack] # Handle string case
     
-    # --- PROJECTS ---
-    typst_code += "\n== Projects\n"
-    
-    projects = profile.get('projects', [])
-    suggested_order = analysis.get("suggested_project_order", [])
-    
-    project_map = {p['name']: p for p in projects}
-    ordered_projects = []
+    if not stack or stack == ["tech"]:
+        return ""
+    return ", ".join(stack)
+
+def project_bullets(p: dict) -> list:
+    # --- BULLET HANDLING (THE FIX) ---
+    # 1. Prefer 'refined_bullets' (AI generated)
+    # 2. Fallback to 'description_raw' (Manual input)
+    bullets = p.get('refined_bullets') or p.get('description_raw')
     
-    for name in suggested_order:
-        for p_name, p_data in project_map.items():
-            if name.lower() in p_name.lower():
-                ordered_projects.append(p_data)
-                if p_name in project_map: del project_map[p_name]
-                break
-    ordered_projects.extend(project_map.values())
-
-    for p in ordered_projects:
-        # Tech Stack
-        stack = p.get('tech_stack', [])
-        if isinstance(stack, str): stack = [stack] # Handle string case
-        
-        if not stack or stack == ["tech"]:
-             tech_str = ""
+    # 3. CRITICAL FIX: If it's a string, wrap it in a list!
+    if isinstance(bullets, str):
+        # Split by newlines if the user typed multiple lines in the text box
+        if '\n' in bullets:
+            bullets = [line.strip() for line in bullets.split('\n') if line.strip()]
         else:
-             tech_str = ", ".join(stack)
-        tech_str = escape_typst(tech_str)
+            bullets = [bullets]
             
-        # --- BULLET HANDLING (THE FIX) ---
-        # 1. Prefer 'refined_bullets' (AI generated)
-        # 2. Fallback to 'description_raw' (Manual input)
-        bullets = p.get('refined_bullets') or p.get('description_raw')
-        
-        # 3. CRITICAL FIX: If it's a string, wrap it in a list!
-        if isinstance(bullets, str):
-            # Split by newlines if the user typed multiple lines in the text box
-            if '\n' in bullets:
-                bullets = [line.strip() for line in bullets.split('\n') if line.strip()]
-            else:
-                bullets = [bullets]
-                
-        if not bullets: bullets = ["No description provided."]
-        
-        # Build Typst List
-        bullet_list = []
-        for b in bullets:
-            clean_b = escape_typst(b)
-            bullet_list.append(f'"{clean_b}"')
-        
-        bullet_str = ", ".join(bullet_list)
-        name_str = escape_typst(p.get('name', ''))
-        
-        typst_code += f'#project_item("{name_str}", "{tech_str}", ({bullet_str}))\n'
-
-    return typst_code
\ No newline at end of file
+    if not bullets: bullets = ["No description provided."]
+    return bullets
+
+def experience_bullets(e: dict) -> list:
+    """Refined bullets if the job has them, else its raw responsibilities."""
+    return as_list(e.get('refined_bullets')) or as_list(e.get('raw_responsibilities'))
+
+def build_projects_section(profile: dict, analysis: dict = None) -> str:
+    """The '== Projects' section, ordered by the gap analysis if given ('' without projects)."""
+    projects = profile.get('projects') or []
+    if not projects: return ""
+    fragments = [
+        _project_fragment(p.get('name', ''), project_tech(p), tuple(str(b) for b in project_bullets(p)))
+        for p in order_projects(projects, analysis)
+    ]
+    return "\n== Projects\n" + "".join(fragments)
+
+def build_experience_section(profile: dict) -> str:
+    jobs = profile.get('experience') or []
+    if not jobs: return ""
+    fragments = [
+        _experience_fragment(e.get('role', ''), e.get('company', ''), date_range(e), tuple(experience_bullets(e)))
+        for e in jobs
+    ]
+    return EXPERIENCE_HEADING + "".join(fragments)
+
+def build_education_section(profile: dict) -> str:
+    schools = profile.get('education') or []
+    if not schools: return ""
+    fragments = [
+        _education_fragment(s.get('institution') or s.get('school', ''), s.get('degree', ''),
+                            date_range(s), s.get('details', '') or "")
+        for s in schools
+    ]
+    return EDUCATION_HEADING + "".join(fragments)
+
+def build_skills_section(profile: dict) -> str:
+    skills = tuple(as_list(profile.get('skills')))
+    return _skills_fragment(skills) if skills else ""
+
+# name -> (profile, analysis) -> Typst; sections without data render as ""
+SECTION_BUILDERS = {
+    "summary": lambda profile, analysis: build_summary_section(profile),
+    "experience": lambda profile, analysis: build_experience_section(profile),
+    "projects": build_projects_section,
+    "education": lambda profile, analysis: build_education_section(profile),
+    "skills": lambda profile, analysis: build_skills_section(profile),
+}
+
+def resolve_section_order(section_order: list = None) -> list:
+    """Known section names in the requested order, without duplicates."""
+    if section_order is None: return list(SECTION_ORDER)
+    seen = []
+    for name in section_order:
+        name = str(name).strip().lower()
+        if name in SECTION_BUILDERS and name not in seen:
+            seen.append(name)
+    return seen
+
+def build_template_data(profile: dict, analysis: dict = None, section_order: list = None) -> dict:
+    """
+    The `data` argument of `resume(data)` in templates/*.typ.
+    Plain strings: the template shows them as text, so nothing is escaped.
+    """
+    raw_name = profile.get('full_name') or profile.get('name') or "Your Name"
+    raw_email = profile.get('email', "email@example.com")
+    if "not public" in raw_email.lower(): raw_email = "your.email@example.com"
+
+    return {
+        "name": raw_name.title(),
+        "github": profile.get('github_username', 'github'),
+        "email": raw_email,
+        "bio": profile.get('bio') or "",
+        "sections": resolve_section_order(section_order),
+        "projects": [
+            {
+                "name": p.get('name', ''),
+                "tech": project_tech(p),
+                "bullets": [str(b) for b in project_bullets(p)],
+            }
+            for p in order_projects(profile.get('projects', []), analysis)
+        ],
+        "experience": [
+            {
+                "role": e.get('role', ''),
+                "company": e.get('company', ''),
+                "dates": date_range(e),
+                "bullets": experience_bullets(e),
+            }
+            for e in profile.get('experience') or []
+        ],
+        "education": [
+            {
+                "institution": s.get('institution') or s.get('school', ''),
+                "degree": s.get('degree', ''),
+                "dates": date_range(s),
+                "details": s.get('details', '') or "",
+            }
+            for s in profile.get('education') or []
+        ],
+        "skills": as_list(profile.get('skills')),
+    }
+
+def build_typst_code(profile: dict, analysis: dict = None, template_name: str="modern",
+                     section_order: list = None) -> str:
+    """Header plus each section in `section_order` (default: SECTION_ORDER)."""
+    if analysis is None: analysis = {}
+    sections = [SECTION_BUILDERS[name](profile, analysis) for name in resolve_section_order(section_order)]
+    return "".join([_header_block(profile)] + sections)
@@ -0,0 +1,240 @@
+"""
+Bulk profile ingestion: fetch many GitHub users concurrently and save
+them through the profile store.
+
+    python -m src.bulk_ingest usernames.txt [--workers 8] [--state data/ingest_state.json]
+
+usernames.txt has one username per line ('#' starts a comment).
+Progress is checkpointed to the state file after every user, so an
+interrupted run picks up where it stopped when started again.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List
+
+try:
+    from src.fetch_github import fetch_github_profile, merge_github_profile
+    from src.github_client import get_github_client, GitHubError, GitHubNotFound, GitHubRateLimited
+    from src.profile_store import get_profile_store
+    from src.persistence import atomic_write_json
+except ModuleNotFoundError:
+    from fetch_github import fetch_github_profile, merge_github_profile
+    from github_client import get_github_client, GitHubError, GitHubNotFound, GitHubRateLimited
+    from profile_store import get_profile_store
+    from persistence import atomic_write_json
+
+# ==================== CONFIG ====================
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+DEFAULT_STATE_PATH = os.path.join(PROJECT_ROOT, "data", "ingest_state.json")
+INGEST_WORKERS = int(os.getenv("BULK_INGEST_WORKERS", "4"))
+MAX_ATTEMPTS = int(os.getenv("BULK_INGEST_ATTEMPTS", "4"))
+# Below this many remaining API calls, requests are spread out until the reset
+RATE_LIMIT_LOW_WATER = int(os.getenv("BULK_INGEST_LOW_WATER", "50"))
+BACKOFF_BASE_S = 1.0
+BACKOFF_MAX_S = 60.0
+
+
+class RateLimitGate:
+    """
+    Shared by all workers. Pauses everyone until the quota resets when
+    GitHub says we're out, and paces requests when the remaining quota
+    gets low so it lasts until the reset.
+    """
+
+    def __init__(self, low_water: int = RATE_LIMIT_LOW_WATER):
+        self.low_water = low_water
+        self._cond = threading.Condition()
+        self._resume_at = 0.0  # epoch seconds
+        self._next_slot = 0.0
+        self.pauses = 0
+        self.waited_s = 0.0
+
+    def wait(self):
+        started = time.time()
+        with self._cond:
+            while True:
+                now = time.time()
+                if now >= self._resume_at:
+                    slot = max(now, self._next_slot)
+                    self._next_slot = slot + self._interval(now)
+                    break
+                self._cond.wait(timeout=self._resume_at - now)
+        delay = slot - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        with self._cond:
+            self.waited_s += time.time() - started
+
+    def _interval(self, now: float) -> float:
+        """Caller holds the condition."""
+        stats = get_github_client().stats()
+        remaining, reset_at = stats["rate_limit_remaining"], stats["rate_limit_reset"]
+        if remaining is None or reset_at is None or remaining > self.low_water:
+            return 0.0
+        return max(reset_at - now, 0.0) / max(remaining, 1)
+
+    def pause_until(self, resume_at: float):
+        with self._cond:
+            if resume_at > self._resume_at:
+                self._resume_at = resume_at
+                self.pauses += 1
+                print(f"⏸️ Rate limited, pausing until {time.strftime('%H:%M:%S', time.localtime(resume_at))}")
+            self._cond.notify_all()
+
+
+class IngestState:
+    """done / failed usernames, checkpointed atomically after every change."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.done: Dict[str, float] = {}
+        self.failed: Dict[str, str] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.done = data.get("done", {})
+            self.failed = data.get("failed", {})
+
+    def _save(self):
+        """Caller holds the lock."""
+        atomic_write_json(self.path, {"done": self.done, "failed": self.failed}, indent=2)
+
+    def mark_done(self, username: str):
+        with self._lock:
+            self.done[username] = time.time()
+            self.failed.pop(username, None)
+            self._save()
+
+    def mark_failed(self, username: str, error: str):
+        with self._lock:
+            self.failed[username] = error
+            self._save()
+
+
+def read_usernames(path: str) -> List[str]:
+    f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        seen = set()
+        names = []
+        for line in f:
+            name = line.split("#", 1)[0].strip()
+            if name and name.lower() not in seen:
+                seen.add(name.lower())
+                names.append(name)
+        return names
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _retryable(error: Exception) -> bool:
+    if isinstance(error, GitHubNotFound):
+        return False
+    if isinstance(error, GitHubRateLimited):
+        return True
+    if isinstance(error, GitHubError):
+        # Network errors have no status; 5xx are GitHub hiccups
+        return error.status is None or error.status >= 500
+    return False
+
+
+def ingest_one(username: str, gate: RateLimitGate, attempts: int = MAX_ATTEMPTS):
+    store = get_profile_store()
+    for attempt in range(1, attempts + 1):
+        gate.wait()
+        try:
+            profile = fetch_github_profile(username)
+            # Re-ingesting (or --force) must not wipe refined bullets and edits
+            store.update(username, lambda existing: profile.model_dump() if existing is None
+                         else merge_github_profile(existing, profile))
+            return
+        except Exception as e:
+            if attempt == attempts or not _retryable(e):
+                raise
+            backoff = min(BACKOFF_BASE_S * 2 ** (attempt - 1), BACKOFF_MAX_S) * random.uniform(0.5, 1.5)
+            if isinstance(e, GitHubRateLimited):
+                gate.pause_until(e.reset_at + 1 if e.reset_at else time.time() + backoff)
+            else:
+                print(f"🔁 {username}: {e} (retry {attempt}/{attempts - 1} in {backoff:.1f}s)")
+                time.sleep(backoff)
+
+
+def run(usernames: List[str], state: IngestState, workers: int = INGEST_WORKERS,
+        force: bool = False, retry_failed: bool = True) -> Dict[str, Any]:
+    todo = [
+        u for u in usernames
+        if force or (u not in state.done and (retry_failed or u not in state.failed))
+    ]
+    stats: Dict[str, Any] = {"total": len(usernames), "skipped": len(usernames) - len(todo),
+                             "ok": 0, "failed": 0}
+    print(f"🚀 Ingesting {len(todo)} profiles with {workers} workers ({stats['skipped']} already done)")
+
+    gate = RateLimitGate()
+    started = time.monotonic()
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+    futures = {pool.submit(ingest_one, u, gate): u for u in todo}
+    interrupted = False
+    try:
+        for future in as_completed(futures):
+            username = futures[future]
+            try:
+                future.result()
+                state.mark_done(username)
+                stats["ok"] += 1
+                print(f"   ✅ {username}")
+            except Exception as e:
+                state.mark_failed(username, str(e))
+                stats["failed"] += 1
+                print(f"   ❌ {username}: {e}")
+    except KeyboardInterrupt:
+        interrupted = True
+        print("\n🛑 Interrupted, finishing in-flight profiles (progress is saved)...")
+        for future in futures:
+            future.cancel()
+    finally:
+        pool.shutdown(wait=True)
+        get_profile_store().flush()
+
+    elapsed = time.monotonic() - started
+    github = get_github_client().stats()
+    stats.update({
+        "interrupted": interrupted,
+        "elapsed_s": round(elapsed, 2),
+        "profiles_per_s": round(stats["ok"] / elapsed, 2) if elapsed > 0 else 0.0,
+        "requests": github["requests"],
+        "not_modified": github["not_modified"],
+        "rate_limit_pauses": gate.pauses,
+        "rate_limit_wait_s": round(gate.waited_s, 2),
+    })
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch many GitHub profiles into the profile store")
+    parser.add_argument("usernames", help="File with one username per line, or - for stdin")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS, help="Concurrent fetches")
+    parser.add_argument("--state", default=DEFAULT_STATE_PATH, help="Checkpoint file used to resume")
+    parser.add_argument("--force", action="store_true", help="Re-fetch users already ingested")
+    parser.add_argument("--skip-failed", action="store_true", help="Don't retry users that failed last run")
+    args = parser.parse_args()
+
+    result = run(read_usernames(args.usernames), IngestState(args.state), workers=max(args.workers, 1),
+                 force=args.force, retry_failed=not args.skip_failed)
+
+    print("\n📊 Ingestion summary")
+    print(f"   ✅ OK: {result['ok']} | ❌ Failed: {result['failed']} | ⏭️ Skipped: {result['skipped']} of {result['total']}")
+    print(f"   ⏱️ {result['elapsed_s']}s ({result['profiles_per_s']} profiles/s)")
+    print(f"   🌐 GitHub requests: {result['requests']} ({result['not_modified']} not modified)")
+    print(f"   ⏸️ Rate-limit pauses: {result['rate_limit_pauses']} ({result['rate_limit_wait_s']}s of worker time spent waiting)")
+    if result["interrupted"]:
+        sys.exit(130)
+    if result["failed"]:
+        sys.exit(1)
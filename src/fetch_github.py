@@ -1,47 +1,62 @@
-import requests
+import os
+import time
+import heapq
+import itertools
 try:
     from src.schemas import UserProfile, Project
+    from src.profile_store import get_profile_store
+    from src.github_client import get_github_client, GitHubNotFound, REPOS_PER_PAGE
+    from src.repo_enrichment import enrich_repos, tech_stack_for, ENRICH_REPOS
 except ModuleNotFoundError:
     from schemas import UserProfile, Project
-import os
+    from profile_store import get_profile_store
+    from github_client import get_github_client, GitHubNotFound, REPOS_PER_PAGE
+    from repo_enrichment import enrich_repos, tech_stack_for, ENRICH_REPOS
 
-def fetch_github_profile(username: str) -> UserProfile:
-    base_url = f"https://api.github.com/users/{username}"
+# Most recently pushed repos considered when picking the top projects
+MAX_REPOS_SCANNED = int(os.getenv("GITHUB_MAX_REPOS", "300"))
+TOP_PROJECTS = 5
+
+def fetch_github_profile(username: str, top_n: int = TOP_PROJECTS,
+                         max_repos: int = MAX_REPOS_SCANNED, enrich: bool = ENRICH_REPOS) -> UserProfile:
+    client = get_github_client()
     
     print(f"🔍 Fetching GitHub data for: {username}...")
     
-    # 1. Fetch Basic Profile
-    user_resp = requests.get(base_url)
-    if user_resp.status_code != 200:
-        raise Exception(f"GitHub User not found: {user_resp.text}")
-    
-    user_data = user_resp.json()
+    # 1. Fetch Basic Profile (a 304 reuses the cached copy)
+    try:
+        user_data = client.get_user(username)
+    except GitHubNotFound:
+        raise GitHubNotFound(f"GitHub User not found: {username}", status=404)
     
-    # 2. Fetch Repositories (Sorted by stars)
-    repos_url = f"{base_url}/repos?sort=updated&per_page=100"
-    repos_resp = requests.get(repos_url)
-    repos_data = repos_resp.json()
+    # 2. Stream Repositories page by page; pages are only requested as needed
+    repo_count = user_data.get('public_repos')
+    limit = max_repos if repo_count is None else min(max_repos, repo_count)
+    repos = []
+    if limit > 0:
+        per_page = min(REPOS_PER_PAGE, limit)
+        repos = itertools.islice(client.iter_repos(username, per_page=per_page), limit)
     
-    # 3. Filter & Clean Projects
-    cleaned_projects = []
-    for repo in repos_data:
-        # Skip forks and empty repos to keep quality high
-        if repo['fork']:
-            continue
-            
+    # 3. Filter & keep the best projects
+    # Skip forks to keep quality high; nlargest keeps pushed order for ties
+    own_repos = (repo for repo in repos if not repo['fork'])
+    top_repos = heapq.nlargest(top_n, own_repos, key=lambda r: r['stargazers_count'])
+
+    # Languages/topics/frameworks for the chosen repos (cached per pushed_at)
+    enrichment = enrich_repos(top_repos) if enrich and top_repos else {}
+
+    cleaned_projects = [
         # Create a Project object (initially empty refined bullets)
-        proj = Project(
+        Project(
             name=repo['name'],
             url=repo['html_url'],
             stars=repo['stargazers_count'],
             # Fix: Handle None description
             description_raw=repo['description'] or "No description provided.",
-            tech_stack=[repo['language']] if repo['language'] else []
+            tech_stack=tech_stack_for(repo, enrichment.get(repo['full_name']))
         )
-        cleaned_projects.append(proj)
-    
-    # Sort by stars (descending) to show best work first
-    cleaned_projects.sort(key=lambda x: x.stars, reverse=True)
+        for repo in top_repos
+    ]
     
     # 4. Create the Master Profile
     # CRITICAL FIX: We use 'or' to handle None values safely
@@ -50,11 +65,49 @@ def fetch_github_profile(username: str) -> UserProfile:
         github_username=username,
         email=user_data.get('email') or "Email not public",
         bio=user_data.get('bio') or "",
-        projects=cleaned_projects[:5] # Keep top 5 best projects
+        projects=cleaned_projects,
+        fetched_at=time.time()
     )
     
     return profile
 
+# Project fields that come from GitHub; everything else (bullets, metrics) is the user's
+GITHUB_PROJECT_FIELDS = ("url", "stars", "description_raw")
+
+def merge_github_profile(existing: dict, fresh: UserProfile, add_new: bool = True) -> dict:
+    """
+    Applies a re-fetched profile on top of the stored one without losing
+    the user's work: refined bullets, metrics, experience and skills stay,
+    GitHub-owned project fields are updated, new top projects are appended.
+    With add_new=False (unattended refreshes) only projects already in the
+    profile are touched, so ones the user removed don't come back.
+    """
+    merged = dict(existing)
+    fresh_data = fresh.model_dump()
+
+    # Keep names/emails the user edited; fill in ones that were never set
+    for field, placeholder in (("full_name", existing.get("github_username")), ("email", "Email not public"), ("bio", "")):
+        if not existing.get(field) or existing.get(field) == placeholder:
+            merged[field] = fresh_data[field]
+
+    fresh_projects = {p["name"]: p for p in fresh_data["projects"]}
+    projects = []
+    for project in existing.get("projects") or []:
+        update = fresh_projects.pop(project.get("name"), None)
+        if update is not None:
+            project = dict(project)
+            for field in GITHUB_PROJECT_FIELDS:
+                project[field] = update[field]
+            stack = list(project.get("tech_stack") or [])
+            project["tech_stack"] = stack + [t for t in update["tech_stack"] if t not in stack]
+        projects.append(project)
+    if add_new:
+        projects.extend(p for p in fresh_data["projects"] if p["name"] in fresh_projects)
+
+    merged["projects"] = projects
+    merged["fetched_at"] = fresh_data["fetched_at"]
+    return merged
+
 # --- Updated Test Block ---
 if __name__ == "__main__":
     target_user = input("Enter your GitHub username: ")
@@ -63,15 +116,10 @@ if __name__ == "__main__":
         
         print("\n SUCCESS! Master Profile Created.")
         
-        # 1. Ensure the folder exists
-        os.makedirs("data", exist_ok=True) 
-
-        # 2. DYNAMIC FILENAME: Use the username in the path
-        filename = f"data/github/{target_user}.json"
-        
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(my_profile.model_dump_json(indent=2))
-            print(f"\n💾 Saved to '{filename}'")
+        # Save through the shared profile store (data/github/{username}.json)
+        store = get_profile_store()
+        store.save(target_user, my_profile.model_dump())
+        print(f"\n💾 Saved to '{store.location(target_user)}'")
             
     except Exception as e:
         print(f" Error: {e}")
\ No newline at end of file
@@ -3,7 +3,8 @@ import os
 import sys
 import re
 import ast
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Iterator, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
 
@@ -25,9 +26,15 @@ if not os.getenv("GOOGLE_API_KEY"):
 # Import schemas (Robust Logic)
 try:
     from src.schemas import UserProfile, GapAnalysis
+    from src.analysis_cache import get_analysis_cache, analysis_fingerprint
+    from src.lexical_scorer import fast_analysis, rank_projects
+    from src.profile_store import get_profile_store
 except ModuleNotFoundError:
     try:
         from schemas import UserProfile, GapAnalysis
+        from analysis_cache import get_analysis_cache, analysis_fingerprint
+        from lexical_scorer import fast_analysis, rank_projects
+        from profile_store import get_profile_store
     except ModuleNotFoundError:
         print("❌ Critical Error: Could not find 'schemas.py'.")
         print(f"   Searched in: {project_root} and {current_dir}")
@@ -35,7 +42,20 @@ except ModuleNotFoundError:
 
 # --- 3. CONFIGURE LLM ---
 # Using 'gemini-1.5-pro' for high-quality reasoning
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-pro")
+MODEL_NAME = "gemini-2.5-pro"
+llm = ChatGoogleGenerativeAI(model=MODEL_NAME)
+
+# How much of the JD the prompt (and the cache key) sees
+JD_CHAR_LIMIT = 4000
+# "hybrid" mode only shows the LLM the locally top-ranked projects
+HYBRID_TOP_K = int(os.getenv("ANALYSIS_HYBRID_TOP_K", "6"))
+# Analysis modes:
+#   llm    - full LLM analysis of every project (default)
+#   fast   - local lexical scorer only, no network
+#   hybrid - LLM analysis over the HYBRID_TOP_K locally ranked projects
+ANALYSIS_MODES = ("llm", "fast", "hybrid")
+# Upper bound on parallel LLM calls for batch analysis
+BATCH_MAX_CONCURRENCY = int(os.getenv("ANALYSIS_BATCH_CONCURRENCY", "4"))
 
 def extract_json_from_text(text: str) -> str:
     """
@@ -56,27 +76,72 @@ def extract_json_from_text(text: str) -> str:
     
     return text
 
-def analyze_job_match(profile_path: str, jd_text: str) -> Dict[str, Any]:
+def build_project_summaries(profile: UserProfile) -> List[str]:
+    """Create simplified summary for AI to read"""
+    return [
+        f"Project: {p.name} | Tech: {p.tech_stack} | Desc: {p.description_raw}"
+        for p in profile.projects
+    ]
+
+def load_user_profile(profile: Union[str, Dict[str, Any], UserProfile]) -> UserProfile:
+    """
+    Accepts a path to a profile JSON file, an in-memory profile dict,
+    or an already-validated UserProfile.
+    """
+    if isinstance(profile, UserProfile):
+        return profile
+    if isinstance(profile, dict):
+        return UserProfile(**profile)
+
+    if not os.path.exists(profile):
+        raise FileNotFoundError(f"Profile not found at {profile}")
+    with open(profile, "r", encoding="utf-8") as f:
+        return UserProfile(**json.load(f))
+
+def analyze_job_match(profile: Union[str, Dict[str, Any], UserProfile], jd_text: str,
+                      mode: str = "llm") -> Dict[str, Any]:
     
     # --- LOAD PROFILE ---
-    if not os.path.exists(profile_path):
-        raise FileNotFoundError(f"Profile not found at {profile_path}")
+    if isinstance(profile, str) and not os.path.exists(profile):
+        raise FileNotFoundError(f"Profile not found at {profile}")
         
     try:
-        with open(profile_path, "r", encoding="utf-8") as f:
-            raw_data = json.load(f)
-            # Validate input data against schema
-            profile = UserProfile(**raw_data)
+        # Validate input data against schema
+        user_profile = load_user_profile(profile)
     except Exception as e:
         print(f"❌ Error loading profile JSON: {e}")
         return {}
 
-    # Create simplified summary for AI to read
-    project_summaries = [
-        f"Project: {p.name} | Tech: {p.tech_stack} | Desc: {p.description_raw}"
-        for p in profile.projects
-    ]
+    return analyze_profile(user_profile, jd_text, mode=mode)
+
+def analyze_profile(profile: UserProfile, jd_text: str,
+                    project_summaries: Optional[List[str]] = None,
+                    mode: str = "llm") -> Dict[str, Any]:
+    """Gap analysis for an already-validated profile."""
+    if mode not in ANALYSIS_MODES:
+        raise ValueError(f"Unknown analysis mode '{mode}', expected one of {ANALYSIS_MODES}")
+
+    if mode == "fast":
+        return fast_analysis(profile, jd_text)
+
+    if mode == "hybrid" and len(profile.projects) > HYBRID_TOP_K:
+        # Shrink the prompt: only the most relevant projects go to the LLM
+        top = [p for p, _ in rank_projects(profile.projects, jd_text)[:HYBRID_TOP_K]]
+        profile = profile.model_copy(update={"projects": top})
+        project_summaries = None
+
+    if project_summaries is None:
+        project_summaries = build_project_summaries(profile)
     
+    # --- CACHE LOOKUP ---
+    jd_excerpt = jd_text[:JD_CHAR_LIMIT]
+    cache = get_analysis_cache()
+    cache_key = analysis_fingerprint(project_summaries, jd_excerpt, MODEL_NAME)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        print(f"\n♻️ Reusing cached analysis for {profile.full_name}'s Profile")
+        return cached
+
     print(f"\n🤔 AI is analyzing the Job Description vs. {profile.full_name}'s Profile...")
 
     # --- THE PROMPT ---
@@ -84,7 +149,7 @@ def analyze_job_match(profile_path: str, jd_text: str) -> Dict[str, Any]:
     Act as a strict Technical Hiring Manager at a FAANG company.
     
     JOB DESCRIPTION:
-    {jd_text[:4000]}... (truncated)
+    {jd_excerpt}... (truncated)
     
     CANDIDATE PROJECTS:
     {json.dumps(project_summaries, indent=2)}
@@ -142,12 +207,43 @@ def analyze_job_match(profile_path: str, jd_text: str) -> Dict[str, Any]:
         
         # 4. Final Validation
         validated_gap = GapAnalysis(**analysis_result)
-        return validated_gap.model_dump()
+        result = validated_gap.model_dump()
+        cache.put(cache_key, result)
+        return result
         
     except Exception as e:
         print(f"❌ Analysis process failed: {e}")
         return {}
 
+def analyze_job_matches(profile: UserProfile, jd_texts: List[str],
+                        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+                        mode: str = "llm") -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Scores one profile against many job descriptions.
+    The profile is summarized once; LLM calls fan out over a bounded pool
+    and (index, analysis) pairs are yielded as each one completes.
+    """
+    project_summaries = build_project_summaries(profile)
+    workers = max(1, min(max_concurrency, BATCH_MAX_CONCURRENCY, len(jd_texts) or 1))
+    
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gap-batch") as pool:
+        futures = {
+            pool.submit(analyze_profile, profile, jd, project_summaries, mode): idx
+            for idx, jd in enumerate(jd_texts)
+        }
+        try:
+            for future in as_completed(futures):
+                idx = futures[future]
+                try:
+                    yield idx, future.result()
+                except Exception as e:
+                    print(f"❌ Batch analysis #{idx} failed: {e}")
+                    yield idx, {}
+        finally:
+            # Consumer went away: don't start the JDs still waiting in the queue
+            for future in futures:
+                future.cancel()
+
 # --- CLI TEST RUNNER ---
 if __name__ == "__main__":
     username = input("Enter GitHub username: ").strip()
@@ -155,7 +251,10 @@ if __name__ == "__main__":
         print("❌ Username is required")
         sys.exit(1)
 
-    profile_path = os.path.join(project_root, "data", "github", f"{username}.json")
+    profile_data = get_profile_store().get(username)
+    if profile_data is None:
+        print(f"❌ No saved profile for {username}")
+        sys.exit(1)
     
     print("\nPaste the Job Description below (Press Ctrl+D or Ctrl+Z on new line to finish):")
     lines = []
@@ -172,7 +271,7 @@ if __name__ == "__main__":
         print("❌ No JD provided.")
         sys.exit(1)
         
-    result = analyze_job_match(profile_path, jd_text)
+    result = analyze_job_match(profile_data, jd_text)
     
     if result:
         print("\n" + "="*50)
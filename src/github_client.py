@@ -0,0 +1,216 @@
+"""
+GitHub REST client used by fetch_github.py.
+- One pooled requests.Session (keep-alive, shared across threads).
+- Conditional requests: the ETag / Last-Modified of every response is kept
+  with its body in data/github_cache.db, and sent back as If-None-Match /
+  If-Modified-Since. A 304 reuses the stored body (and doesn't count
+  against the rate limit when authenticated).
+- Lazy pagination: the next page of repos is only requested when the
+  caller asks for more.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ==================== CONFIG ====================
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "github_cache.db")
+POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", "10"))
+REQUEST_TIMEOUT_S = float(os.getenv("GITHUB_TIMEOUT", "15"))
+REPOS_PER_PAGE = 100
+
+
+class GitHubError(Exception):
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class GitHubNotFound(GitHubError):
+    pass
+
+
+class GitHubRateLimited(GitHubError):
+    def __init__(self, message: str, reset_at: Optional[float] = None, status: Optional[int] = None):
+        super().__init__(message, status)
+        self.reset_at = reset_at  # epoch seconds when the quota refills, if known
+
+
+class ConditionalCache:
+    """url -> (etag, last_modified, body, next_url). One SQLite connection per thread."""
+
+    def __init__(self, db_path: str = CACHE_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body TEXT NOT NULL,
+                next_url TEXT,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def get(self, url: str) -> Optional[sqlite3.Row]:
+        return self._connect().execute(
+            "SELECT etag, last_modified, body, next_url FROM http_cache WHERE url = ?", (url,)
+        ).fetchone()
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str],
+            body: str, next_url: Optional[str]):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO http_cache (url, etag, last_modified, body, next_url, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body, next_url, time.time()),
+            )
+
+    def touch(self, url: str):
+        conn = self._connect()
+        with conn:
+            conn.execute("UPDATE http_cache SET fetched_at = ? WHERE url = ?", (time.time(), url))
+
+
+class GitHubClient:
+    def __init__(self, base_url: str = GITHUB_API_URL, token: Optional[str] = GITHUB_TOKEN,
+                 cache: Optional[ConditionalCache] = None, pool_size: int = POOL_SIZE,
+                 timeout: float = REQUEST_TIMEOUT_S):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cache = cache or ConditionalCache()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Accept": "application/vnd.github+json",
+            "User-Agent": "ai-resume-builder",
+        })
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._not_modified = 0
+        self._rate_remaining: Optional[int] = None
+        self._rate_reset: Optional[float] = None
+
+    def _url(self, path: str) -> str:
+        return path if path.startswith(("http://", "https://")) else f"{self.base_url}/{path.lstrip('/')}"
+
+    def _note_rate_limit(self, resp: requests.Response):
+        remaining = resp.headers.get("X-RateLimit-Remaining")
+        reset = resp.headers.get("X-RateLimit-Reset")
+        with self._lock:
+            if remaining is not None and remaining.isdigit():
+                self._rate_remaining = int(remaining)
+            if reset is not None and reset.isdigit():
+                self._rate_reset = float(reset)
+
+    # ==================== REQUESTS ====================
+    def get_json(self, path: str) -> Tuple[Any, Optional[str]]:
+        """
+        GETs a URL (or path under base_url) conditionally.
+        Returns (parsed body, next page URL from the Link header or None).
+        """
+        url = self._url(path)
+        cached = self.cache.get(url)
+        headers = {}
+        if cached is not None:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            resp = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise GitHubError(f"GitHub request failed: {e}") from e
+        self._note_rate_limit(resp)
+        with self._lock:
+            self._requests += 1
+
+        if resp.status_code == 304 and cached is not None:
+            with self._lock:
+                self._not_modified += 1
+            self.cache.touch(url)
+            return json.loads(cached["body"]), cached["next_url"]
+
+        if resp.status_code == 404:
+            raise GitHubNotFound(f"Not found on GitHub: {url}", status=404)
+        if resp.status_code in (403, 429) and (
+            resp.headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in resp.headers
+        ):
+            retry_after = resp.headers.get("Retry-After")
+            reset = resp.headers.get("X-RateLimit-Reset")
+            if retry_after and retry_after.isdigit():
+                reset_at = time.time() + int(retry_after)
+            else:
+                reset_at = float(reset) if reset and reset.isdigit() else None
+            raise GitHubRateLimited("GitHub rate limit exceeded", reset_at=reset_at, status=resp.status_code)
+        if resp.status_code != 200:
+            raise GitHubError(f"GitHub returned {resp.status_code}: {resp.text[:200]}", status=resp.status_code)
+
+        next_url = resp.links.get("next", {}).get("url")
+        self.cache.put(url, resp.headers.get("ETag"), resp.headers.get("Last-Modified"), resp.text, next_url)
+        return resp.json(), next_url
+
+    def get_user(self, username: str) -> Dict[str, Any]:
+        user, _ = self.get_json(f"users/{username}")
+        return user
+
+    def iter_repos(self, username: str, per_page: int = REPOS_PER_PAGE) -> Iterator[Dict[str, Any]]:
+        """Yields the user's repos, fetching the next page only when the current one is used up."""
+        url: Optional[str] = f"users/{username}/repos?sort=pushed&per_page={per_page}"
+        while url:
+            page, url = self.get_json(url)
+            yield from page
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "not_modified": self._not_modified,
+                "rate_limit_remaining": self._rate_remaining,
+                "rate_limit_reset": self._rate_reset,
+            }
+
+    def close(self):
+        self.session.close()
+
+
+# ==================== SHARED INSTANCE ====================
+_client: Optional[GitHubClient] = None
+_client_lock = threading.Lock()
+
+
+def get_github_client() -> GitHubClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GitHubClient()
+        return _client
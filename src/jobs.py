@@ -0,0 +1,153 @@
+"""
+Background job queue for long-running resume generation.
+A job runs on a bounded thread pool, records how long each stage took,
+and keeps its result (including the PDF bytes) until it expires.
+"""
+
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Callable
+
+# ==================== CONFIG ====================
+JOB_WORKERS = int(os.getenv("GENERATE_JOB_WORKERS", "4"))
+# Jobs allowed to wait for a worker before new submissions are rejected
+MAX_QUEUED_JOBS = int(os.getenv("GENERATE_MAX_QUEUED", "32"))
+# Finished jobs (and their PDFs) are dropped after this many seconds
+JOB_TTL_S = float(os.getenv("GENERATE_JOB_TTL", "900"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Backpressure: the job queue is at capacity."""
+
+
+class Job:
+    """State of one generation run. Also usable on its own as a stage timer."""
+
+    def __init__(self, kind: str = "generate"):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = QUEUED
+        self.current_stage: Optional[str] = None
+        self.timings_ms: Dict[str, float] = {}
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.pdf: Optional[bytes] = None
+        self.error: Optional[str] = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """Marks the current stage and records its wall time."""
+        self.current_stage = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.current_stage,
+            "timings_ms": dict(self.timings_ms),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.started_at:
+            data["queued_ms"] = round((self.started_at - self.created_at) * 1000, 1)
+        if self.status == DONE:
+            data["result"] = self.result
+        if self.status == FAILED:
+            data["error"] = self.error
+        return data
+
+
+class JobManager:
+    def __init__(self, workers: int = JOB_WORKERS, max_queued: int = MAX_QUEUED_JOBS,
+                 ttl_s: float = JOB_TTL_S):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="resume-job")
+        self._workers = workers
+        self._max_queued = max_queued
+        self._ttl_s = ttl_s
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def _purge_expired(self):
+        """Caller holds the lock."""
+        cutoff = time.time() - self._ttl_s
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, fn: Callable[[Job], Dict[str, Any]], kind: str = "generate") -> Job:
+        """
+        Queues fn(job) and returns immediately.
+        fn returns the JSON result and may set job.pdf.
+        """
+        with self._lock:
+            self._purge_expired()
+            queued = sum(1 for j in self._jobs.values() if j.status == QUEUED)
+            if queued >= self._max_queued:
+                raise JobQueueFull(f"Generation queue is full ({queued} jobs waiting)")
+            job = Job(kind)
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def record(self, job: Job, result: Dict[str, Any]) -> Job:
+        """
+        Keeps a job that already ran on the request thread (sync /generate)
+        so its PDF is served from /jobs/{id}/result until it expires.
+        """
+        job.result = result
+        job.status = DONE
+        job.finished_at = time.time()
+        with self._lock:
+            self._purge_expired()
+            self._jobs[job.id] = job
+        return job
+
+    def _run(self, job: Job, fn: Callable[[Job], Dict[str, Any]]):
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = fn(job)
+            job.status = DONE
+        except Exception as e:
+            print(f"❌ Job {job.id} failed in stage '{job.current_stage}': {e}")
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return {"workers": self._workers, "max_queued": self._max_queued, **counts}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
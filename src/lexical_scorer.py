@@ -0,0 +1,216 @@
+"""
+Local lexical scorer for job matching.
+Ranks projects against a job description with BM25 over tokenized
+names, tech stacks and descriptions (with a skill synonym dictionary),
+and derives a provisional match score from skill coverage.
+Deterministic and offline: no LLM, no network.
+"""
+
+import re
+import math
+from collections import Counter
+from typing import Dict, Any, List, Tuple, Iterable
+
+try:
+    from src.schemas import UserProfile, Project, GapAnalysis
+except ModuleNotFoundError:
+    from schemas import UserProfile, Project, GapAnalysis
+
+# ==================== VOCABULARY ====================
+# Multi-word / punctuated skills, rewritten before tokenizing
+PHRASE_SYNONYMS = {
+    "machine learning": "ml",
+    "deep learning": "dl",
+    "natural language processing": "nlp",
+    "computer vision": "computervision",
+    "amazon web services": "aws",
+    "google cloud platform": "gcp",
+    "google cloud": "gcp",
+    "scikit-learn": "sklearn",
+    "ci/cd": "cicd",
+    "node.js": "node",
+    "next.js": "nextjs",
+    "vue.js": "vue",
+    "react.js": "react",
+    "react native": "reactnative",
+    "ruby on rails": "rails",
+    "spring boot": "spring",
+    "github actions": "githubactions",
+    "jupyter notebook": "jupyter",
+}
+
+# Single-token aliases -> canonical skill
+SKILL_SYNONYMS = {
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "nodejs": "node",
+    "reactjs": "react",
+    "vuejs": "vue",
+    "tf": "terraform",
+    "torch": "pytorch",
+    "cpp": "c++",
+    "csharp": "c#",
+    "dotnet": ".net",
+    "llms": "llm",
+    "genai": "llm",
+    "restful": "rest",
+    "springboot": "spring",
+}
+
+KNOWN_SKILLS = frozenset({
+    "python", "java", "javascript", "typescript", "go", "rust", "c++", "c#", "ruby",
+    "php", "kotlin", "swift", "scala", "dart", "sql", "nosql", "html", "css", "bash",
+    "react", "angular", "vue", "svelte", "nextjs", "node", "express", "django", "flask",
+    "fastapi", "spring", "rails", "flutter", "reactnative", "tailwind", ".net",
+    "graphql", "rest", "grpc", "websocket", "microservices",
+    "docker", "kubernetes", "terraform", "ansible", "helm", "aws", "gcp", "azure",
+    "linux", "git", "github", "gitlab", "cicd", "githubactions", "jenkins", "nginx", "serverless",
+    "postgresql", "mysql", "sqlite", "mongodb", "redis", "kafka", "rabbitmq",
+    "elasticsearch", "spark", "hadoop", "airflow", "snowflake", "dbt",
+    "pandas", "numpy", "pytorch", "tensorflow", "keras", "sklearn", "ml", "dl",
+    "nlp", "computervision", "llm", "langchain", "opencv", "jupyter",
+})
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have",
+    "in", "is", "it", "its", "of", "on", "or", "our", "that", "the", "their", "this",
+    "to", "we", "will", "with", "you", "your", "using", "used", "use", "built",
+    "build", "project", "experience", "years", "work", "working", "team", "strong",
+    "knowledge", "ability", "skills", "plus", "etc", "e.g", "i.e", "no", "description",
+    "provided",
+})
+
+_PHRASES = re.compile(
+    "|".join(re.escape(p) for p in sorted(PHRASE_SYNONYMS, key=len, reverse=True)),
+    re.IGNORECASE,
+)
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_WORD = re.compile(r"[A-Za-z0-9][A-Za-z0-9+#.]*")
+
+# How much more a tech_stack entry counts than a word in the description
+TECH_WEIGHT = 3
+NAME_WEIGHT = 2
+
+
+# ==================== TOKENIZER ====================
+def _canonical(word: str) -> str:
+    word = word.lower().rstrip(".")
+    return SKILL_SYNONYMS.get(word, word)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercases, applies phrase/alias synonyms and drops stopwords.
+    camelCase names are split unless the whole word is a known skill
+    (so 'myReactApp' -> my, react, app but 'PostgreSQL' stays whole).
+    """
+    if not text:
+        return []
+    text = _PHRASES.sub(lambda m: f" {PHRASE_SYNONYMS[m.group(0).lower()]} ", str(text))
+    text = text.replace("-", " ").replace("_", " ")
+
+    tokens = []
+    for word in _WORD.findall(text):
+        token = _canonical(word)
+        parts = [token] if token in KNOWN_SKILLS else [_canonical(w) for w in _CAMEL.sub(" ", word).split()]
+        for part in parts:
+            if part and part not in STOPWORDS:
+                tokens.append(part)
+    return tokens
+
+
+def project_tokens(project: Project) -> List[str]:
+    tokens: List[str] = []
+    for tech in project.tech_stack:
+        tokens.extend(tokenize(tech) * TECH_WEIGHT)
+    tokens.extend(tokenize(project.name) * NAME_WEIGHT)
+    tokens.extend(tokenize(project.description_raw))
+    return tokens
+
+
+# ==================== BM25 ====================
+def bm25_scores(documents: List[List[str]], query: Iterable[str],
+                k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """Okapi BM25 of each document against the query (query tf is log-damped)."""
+    n_docs = len(documents)
+    if n_docs == 0:
+        return []
+    avg_len = (sum(len(d) for d in documents) / n_docs) or 1.0
+
+    doc_freq: Counter = Counter()
+    term_freqs = []
+    for doc in documents:
+        tf = Counter(doc)
+        term_freqs.append(tf)
+        doc_freq.update(tf.keys())
+
+    query_weights = {t: 1 + math.log(c) for t, c in Counter(query).items()}
+    idf = {
+        t: math.log(1 + (n_docs - doc_freq[t] + 0.5) / (doc_freq[t] + 0.5))
+        for t in query_weights if doc_freq[t]
+    }
+
+    scores = []
+    for doc, tf in zip(documents, term_freqs):
+        norm = k1 * (1 - b + b * len(doc) / avg_len)
+        score = 0.0
+        for term, term_idf in idf.items():
+            f = tf.get(term)
+            if f:
+                score += query_weights[term] * term_idf * f * (k1 + 1) / (f + norm)
+        scores.append(score)
+    return scores
+
+
+# ==================== PUBLIC API ====================
+def rank_projects(projects: List[Project], jd_text: str) -> List[Tuple[Project, float]]:
+    """Projects sorted by relevance to the JD (stable for ties)."""
+    scores = bm25_scores([project_tokens(p) for p in projects], tokenize(jd_text))
+    ranked = sorted(enumerate(zip(projects, scores)), key=lambda item: (-item[1][1], item[0]))
+    return [pair for _, pair in ranked]
+
+
+def fast_analysis(profile: UserProfile, jd_text: str) -> Dict[str, Any]:
+    """
+    Provisional GapAnalysis without an LLM call.
+    match_score is the share of skills named in the JD that appear anywhere
+    in the profile; project order comes from BM25.
+    """
+    jd_tokens = tokenize(jd_text)
+    jd_skill_counts = Counter(t for t in jd_tokens if t in KNOWN_SKILLS)
+
+    profile_terms = set(tokenize(" ".join(profile.skills)))
+    for p in profile.projects:
+        profile_terms.update(project_tokens(p))
+
+    missing = [skill for skill, _ in jd_skill_counts.most_common() if skill not in profile_terms]
+    if jd_skill_counts:
+        covered = len(jd_skill_counts) - len(missing)
+        match_score = round(100 * covered / len(jd_skill_counts))
+    else:
+        match_score = 0
+
+    ranked = rank_projects(profile.projects, jd_text)
+    relevant = [p.name for p, score in ranked if score > 0]
+
+    critique = (
+        f"Provisional local score: {len(jd_skill_counts) - len(missing)} of "
+        f"{len(jd_skill_counts)} skills named in the JD appear in the profile."
+        if jd_skill_counts else
+        "Provisional local score: no recognizable skills found in the JD."
+    )
+
+    return GapAnalysis(
+        match_score=match_score,
+        missing_critical_skills=missing[:10],
+        suggested_project_order=relevant,
+        critique=critique,
+    ).model_dump()
@@ -0,0 +1,162 @@
+"""
+Disk persistence helpers.
+- atomic_write_json: write-to-temp + rename, so readers never see a torn file.
+- WriteBehindWriter: defers writes to a background thread and coalesces
+  rapid updates to the same key into a single write of the latest data.
+  Keys are file paths by default; pass a sink to write anywhere else.
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+from typing import Dict, Any, Optional, Tuple, Callable
+
+# Seconds a write waits for newer data before it hits the disk
+WRITE_BEHIND_DELAY_S = float(os.getenv("PROFILE_WRITE_DELAY", "0.5"))
+
+
+def atomic_write_json(path: str, data: Any, indent: Optional[int] = None):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".json.tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class WriteBehindWriter:
+    """
+    Callers hand over data and return immediately. The latest data for each
+    key is written once it has been quiet for `delay` seconds.
+    Data must not be mutated after it is scheduled.
+    """
+
+    def __init__(self, delay: float = WRITE_BEHIND_DELAY_S, indent: Optional[int] = None,
+                 on_write: Optional[Callable[[str], None]] = None,
+                 sink: Optional[Callable[[str, Any], None]] = None):
+        self.delay = delay
+        self.indent = indent
+        # Called with the key after each successful write
+        self.on_write = on_write
+        # Performs the actual write; default treats the key as a JSON file path
+        self.sink = sink or (lambda path, data: atomic_write_json(path, data, indent=self.indent))
+        self._pending: Dict[str, Tuple[float, int, Any]] = {}  # path -> (due_at, version, data)
+        self._version = 0
+        self._on_disk: Dict[str, int] = {}  # path -> last version written
+        self._cond = threading.Condition()
+        # Disk writes happen outside _cond so schedule() never waits on I/O
+        self._io_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._scheduled = 0
+        self._written = 0
+        self._failed = 0
+
+    def _ensure_thread(self):
+        """Caller holds the condition."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def schedule(self, path: str, data: Any):
+        with self._cond:
+            # A newer version replaces (coalesces) the queued one
+            self._version += 1
+            self._pending[path] = (time.monotonic() + self.delay, self._version, data)
+            self._scheduled += 1
+            stopped = self._stopped
+            if not stopped:
+                self._ensure_thread()
+                self._cond.notify()
+        if stopped:
+            # Shut down: write through instead of queueing forever
+            self.flush()
+
+    def _write(self, path: str, version: int, data: Any):
+        with self._io_lock:
+            # A concurrent flush may already have written something newer
+            if self._on_disk.get(path, 0) > version:
+                return
+            try:
+                self.sink(path, data)
+                self._on_disk[path] = version
+                ok = True
+            except Exception as e:
+                print(f"⚠️ Write-behind failed for {path}: {e}")
+                ok = False
+        with self._cond:
+            if ok:
+                self._written += 1
+            else:
+                self._failed += 1
+        if ok and self.on_write is not None:
+            self.on_write(path)
+
+    def write_through(self, path: str, data: Any):
+        """
+        Writes synchronously, superseding any queued write for the path.
+        Unlike schedule(), errors propagate to the caller.
+        """
+        with self._cond:
+            self._version += 1
+            version = self._version
+            self._pending.pop(path, None)
+        with self._io_lock:
+            self.sink(path, data)
+            self._on_disk[path] = version
+        with self._cond:
+            self._written += 1
+        if self.on_write is not None:
+            self.on_write(path)
+
+    def _take(self, only_due: bool):
+        """Caller holds the condition."""
+        now = time.monotonic()
+        paths = [p for p, (due_at, _, _) in self._pending.items() if not only_due or due_at <= now]
+        return [(path, *self._pending.pop(path)[1:]) for path in paths]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+                batch = self._take(only_due=True)
+                if not batch:
+                    next_due = min(due_at for due_at, _, _ in self._pending.values())
+                    self._cond.wait(timeout=max(next_due - time.monotonic(), 0.0))
+                    continue
+            for path, version, data in batch:
+                self._write(path, version, data)
+
+    def flush(self):
+        """Writes everything still pending right now."""
+        with self._cond:
+            batch = self._take(only_due=False)
+        for path, version, data in batch:
+            self._write(path, version, data)
+
+    def shutdown(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "scheduled": self._scheduled,
+                "written": self._written,
+                "coalesced": max(self._scheduled - self._written - self._failed - len(self._pending), 0),
+                "failed": self._failed,
+            }
@@ -0,0 +1,285 @@
+"""
+Background refresh of GitHub profiles.
+Every profile records when it was last fetched (fetched_at). get_profile
+serves whatever is stored and asks the refresher to revalidate stale
+ones, so requests never wait on GitHub. A refresh merges the new GitHub
+data into the stored profile (refined bullets etc. are kept).
+
+Staleness is per profile: it starts at REFRESH_TTL_S, doubles (up to
+REFRESH_MAX_TTL_S) each time a refresh finds nothing changed and resets
+when something did; a profile can pin its own with `refresh_ttl_s`.
+Refreshes draw from a global hourly budget of GitHub API calls (each is
+charged what a fetch can cost, see refresh_cost) and stop while the GitHub
+quota is down to REFRESH_RESERVE calls, leaving it for live requests.
+A refresh only updates projects already in the profile: new repos are
+picked up by an explicit fetch, and ones the user removed stay removed.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable
+
+try:
+    from src.fetch_github import fetch_github_profile, merge_github_profile, TOP_PROJECTS
+    from src.repo_enrichment import ENRICH_REPOS, DETECT_FRAMEWORKS, FRAMEWORK_MARKERS
+    from src.github_client import get_github_client, GitHubNotFound, GitHubRateLimited
+    from src.profile_store import ProfileStore, get_profile_store
+except ModuleNotFoundError:
+    from fetch_github import fetch_github_profile, merge_github_profile, TOP_PROJECTS
+    from repo_enrichment import ENRICH_REPOS, DETECT_FRAMEWORKS, FRAMEWORK_MARKERS
+    from github_client import get_github_client, GitHubNotFound, GitHubRateLimited
+    from profile_store import ProfileStore, get_profile_store
+
+# ==================== CONFIG ====================
+REFRESH_ENABLED = os.getenv("PROFILE_REFRESH", "1") != "0"
+REFRESH_TTL_S = float(os.getenv("PROFILE_REFRESH_TTL", str(24 * 3600)))
+REFRESH_MAX_TTL_S = float(os.getenv("PROFILE_REFRESH_MAX_TTL", str(7 * 24 * 3600)))
+# GitHub API calls background refreshes may spend per hour, across the whole server
+REFRESH_BUDGET_PER_HOUR = float(os.getenv("PROFILE_REFRESH_BUDGET", "1000"))
+# GitHub calls left untouched for foreground fetches
+REFRESH_RESERVE = int(os.getenv("PROFILE_REFRESH_RESERVE", "20"))
+# How often all stored profiles are checked for staleness
+SCAN_INTERVAL_S = float(os.getenv("PROFILE_REFRESH_SCAN", "3600"))
+
+
+class FetchBudget:
+    """Token bucket: `per_hour` tokens, refilled continuously."""
+
+    def __init__(self, per_hour: float = REFRESH_BUDGET_PER_HOUR):
+        self.capacity = max(per_hour, 1.0)
+        self.rate = per_hour / 3600.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_take(self, cost: float = 1.0) -> bool:
+        cost = min(cost, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < cost:
+                return False
+            self._tokens -= cost
+            return True
+
+    def seconds_until_token(self, cost: float = 1.0) -> float:
+        with self._lock:
+            missing = min(cost, self.capacity) - self._tokens
+            return 0.0 if missing <= 0 or self.rate <= 0 else missing / self.rate
+
+
+def refresh_cost(enrich: bool = ENRICH_REPOS, detect_frameworks: bool = DETECT_FRAMEWORKS) -> int:
+    """
+    GitHub calls one profile fetch can make: the user, the first page of
+    repos, and per top repo its languages (plus one per manifest).
+    """
+    per_repo = 1 + len(FRAMEWORK_MARKERS) if detect_frameworks else 1
+    return 2 + (TOP_PROJECTS * per_repo if enrich else 0)
+
+
+def _github_fingerprint(profile: Dict[str, Any]) -> tuple:
+    """The parts of a profile a refresh can change."""
+    return tuple(
+        (p.get("name"), p.get("stars"), p.get("description_raw"), tuple(p.get("tech_stack") or []))
+        for p in profile.get("projects") or []
+    )
+
+
+class ProfileRefresher:
+    def __init__(self, store: Optional[ProfileStore] = None,
+                 fetch: Callable = fetch_github_profile,
+                 ttl_s: float = REFRESH_TTL_S, max_ttl_s: float = REFRESH_MAX_TTL_S,
+                 budget: Optional[FetchBudget] = None, reserve: int = REFRESH_RESERVE,
+                 scan_interval_s: float = SCAN_INTERVAL_S):
+        self.store = store or get_profile_store()
+        self.fetch = fetch
+        self.ttl_s = ttl_s
+        self.max_ttl_s = max_ttl_s
+        self.budget = budget or FetchBudget()
+        self.cost = refresh_cost()
+        self.reserve = reserve
+        self.scan_interval_s = scan_interval_s
+
+        self._cond = threading.Condition()
+        self._queue: "OrderedDict[str, None]" = OrderedDict()  # usernames waiting, deduplicated
+        self._ttl: Dict[str, float] = {}  # adaptive TTL per profile
+        self._retry_at: Dict[str, float] = {}  # failed profiles wait a TTL before retrying
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._next_scan = 0.0
+        self._refreshed = 0
+        self._unchanged = 0
+        self._failed = 0
+        self._deferred = 0
+
+    # ==================== POLICY ====================
+    def ttl_for(self, username: str, profile: Dict[str, Any]) -> float:
+        pinned = profile.get("refresh_ttl_s")
+        if isinstance(pinned, (int, float)) and pinned > 0:
+            return float(pinned)
+        with self._cond:
+            return self._ttl.get(username, self.ttl_s)
+
+    def is_stale(self, username: str, profile: Dict[str, Any]) -> bool:
+        fetched_at = profile.get("fetched_at")
+        if not fetched_at:
+            return True
+        return time.time() - fetched_at > self.ttl_for(username, profile)
+
+    def _failed_refresh(self, username: str):
+        """Backs off as if nothing changed and holds off retries for one TTL."""
+        self._adapt_ttl(username, changed=False)
+        with self._cond:
+            self._failed += 1
+            self._retry_at[username] = time.time() + self._ttl[username]
+
+    def _adapt_ttl(self, username: str, changed: bool):
+        with self._cond:
+            current = self._ttl.get(username, self.ttl_s)
+            self._ttl[username] = self.ttl_s if changed else min(current * 2, self.max_ttl_s)
+
+    # ==================== QUEUE ====================
+    def request_refresh(self, username: str):
+        """Queues a revalidation; returns immediately."""
+        with self._cond:
+            if self._stopped or username in self._queue:
+                return
+            self._queue[username] = None
+            self._cond.notify()
+
+    def refresh_if_stale(self, username: str, profile: Dict[str, Any]) -> bool:
+        with self._cond:
+            if time.time() < self._retry_at.get(username, 0.0):
+                return False
+        if self.is_stale(username, profile):
+            self.request_refresh(username)
+            return True
+        return False
+
+    def _scan(self):
+        """Queues every stored profile that has gone stale."""
+        for username in self.store.backend.list_usernames():
+            try:
+                profile = self.store.get(username)
+            except Exception:
+                continue
+            if profile is not None and profile.get("github_username"):
+                self.refresh_if_stale(username, profile)
+
+    def _quota_low(self) -> bool:
+        remaining = get_github_client().stats()["rate_limit_remaining"]
+        return remaining is not None and remaining <= self.reserve
+
+    # ==================== WORKER ====================
+    def refresh(self, username: str) -> bool:
+        """Fetches and merges one profile. Returns True if anything changed."""
+        current = self.store.get(username)
+        if current is None:
+            return False
+        fresh = self.fetch(current.get("github_username") or username)
+
+        # Merge into whatever is stored now (the user may have saved while we
+        # were fetching), under the user's lock so no save lands in between
+        changed = False
+
+        def merge(latest: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+            nonlocal changed
+            if latest is None:
+                return None
+            merged = merge_github_profile(latest, fresh, add_new=False)
+            changed = _github_fingerprint(merged) != _github_fingerprint(latest)
+            return merged
+
+        self.store.update(username, merge)
+        self._adapt_ttl(username, changed)
+        with self._cond:
+            self._retry_at.pop(username, None)
+        return changed
+
+    def _next_username(self) -> Optional[str]:
+        """Blocks until there is work the budget allows, or shutdown."""
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return None
+                now = time.monotonic()
+                scan_due = now >= self._next_scan
+                if scan_due:
+                    self._next_scan = now + self.scan_interval_s
+                elif self._queue:
+                    if not self._quota_low() and self.budget.try_take(self.cost):
+                        return self._queue.popitem(last=False)[0]
+                    self._deferred += 1
+                    wait = max(self.budget.seconds_until_token(self.cost), 60.0 if self._quota_low() else 1.0)
+                else:
+                    wait = self._next_scan - now
+                if not scan_due:
+                    self._cond.wait(timeout=wait)
+                    continue
+            self._scan()
+
+    def _run(self):
+        while True:
+            username = self._next_username()
+            if username is None:
+                return
+            try:
+                changed = self.refresh(username)
+                with self._cond:
+                    if changed:
+                        self._refreshed += 1
+                    else:
+                        self._unchanged += 1
+                print(f"🔄 Refreshed {username}{'' if changed else ' (unchanged)'}")
+            except GitHubRateLimited as e:
+                # Put it back and let the gate above hold off until the quota resets
+                self.request_refresh(username)
+                with self._cond:
+                    self._failed += 1
+                    self._cond.wait(timeout=max((e.reset_at or 0) - time.time(), 60.0))
+            except GitHubNotFound:
+                # Not a (public) GitHub user
+                self._failed_refresh(username)
+            except Exception as e:
+                print(f"⚠️ Refresh failed for {username}: {e}")
+                self._failed_refresh(username)
+
+    # ==================== LIFECYCLE ====================
+    def start(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name="profile-refresh", daemon=True)
+                self._thread.start()
+
+    def shutdown(self):
+        with self._cond:
+            self._stopped = True
+            self._queue.clear()
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "queued": len(self._queue),
+                "refreshed": self._refreshed,
+                "unchanged": self._unchanged,
+                "failed": self._failed,
+                "deferred_by_budget": self._deferred,
+            }
+
+
+# ==================== SHARED INSTANCE ====================
+_refresher: Optional[ProfileRefresher] = None
+_refresher_lock = threading.Lock()
+
+
+def get_profile_refresher() -> ProfileRefresher:
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = ProfileRefresher()
+        return _refresher
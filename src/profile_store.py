@@ -0,0 +1,209 @@
+"""
+Profile store: the single read/write path for profiles.
+Parsed profiles live in an in-process LRU in front of a storage backend
+(data/github/*.json or SQLite, see storage.py). Entries are re-validated
+against the backend's signature (file mtime/size or row version) at most
+every STAT_INTERVAL_S, so hot profiles are served without reading or
+parsing JSON. Writes go through the store, update the cache immediately
+and reach the backend atomically.
+"""
+
+import os
+import copy
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Hashable, Callable
+
+try:
+    from src.persistence import WriteBehindWriter
+    from src.storage import create_backend, validate_username
+except ModuleNotFoundError:
+    from persistence import WriteBehindWriter
+    from storage import create_backend, validate_username
+
+# ==================== CONFIG ====================
+MAX_CACHED_PROFILES = int(os.getenv("PROFILE_CACHE_SIZE", "512"))
+# How often a cached entry re-checks its file for outside edits
+STAT_INTERVAL_S = float(os.getenv("PROFILE_STAT_INTERVAL", "1.0"))
+# Per-user write locks are striped over this many locks
+USER_LOCK_STRIPES = 64
+
+
+class _Entry:
+    __slots__ = ("data", "signature", "checked_at", "dirty")
+
+    def __init__(self, data: Dict[str, Any], signature: Optional[Hashable], dirty: bool = False):
+        self.data = data
+        self.signature = signature  # backend version this came from
+        self.checked_at = time.monotonic()
+        self.dirty = dirty          # newer than what's on disk (write pending)
+
+
+class ProfileStore:
+    def __init__(self, backend=None, max_entries: int = MAX_CACHED_PROFILES,
+                 stat_interval: float = STAT_INTERVAL_S):
+        self.backend = backend or create_backend()
+        self.max_entries = max_entries
+        self.stat_interval = stat_interval
+        self._cache: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Serialize read-modify-write per user; reentrant so update() can save()
+        self._user_locks = [threading.RLock() for _ in range(USER_LOCK_STRIPES)]
+        # Keyed by username; the backend does the actual write
+        self._writer = WriteBehindWriter(sink=self.backend.write, on_write=self._on_written)
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+
+    def location(self, username: str) -> str:
+        """Where the profile lives, for log messages."""
+        return self.backend.location(username)
+
+    # ==================== CACHE ====================
+    def _remember(self, username: str, entry: _Entry):
+        """Caller holds the lock."""
+        self._cache[username] = entry
+        self._cache.move_to_end(username)
+        while len(self._cache) > self.max_entries:
+            # Never drop data that hasn't reached disk yet
+            victim = next((k for k, e in self._cache.items() if not e.dirty), None)
+            if victim is None:
+                break
+            del self._cache[victim]
+
+    def _on_written(self, username: str):
+        signature = self.backend.signature(username)
+        with self._lock:
+            entry = self._cache.get(username)
+            if entry is not None:
+                entry.signature = signature
+                entry.checked_at = time.monotonic()
+                entry.dirty = False
+
+    # ==================== READ ====================
+    def get(self, username: str, copy_data: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Returns the parsed profile or None if it doesn't exist.
+        The returned dict is shared with the cache: treat it as read-only,
+        or pass copy_data=True to get a private copy to mutate.
+        """
+        validate_username(username)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._cache.get(username)
+            if entry is not None:
+                fresh = entry.dirty or now - entry.checked_at < self.stat_interval
+                if not fresh and self.backend.signature(username) == entry.signature:
+                    entry.checked_at = now
+                    fresh = True
+                if fresh:
+                    self._cache.move_to_end(username)
+                    self._hits += 1
+                    data = entry.data
+                    return copy.deepcopy(data) if copy_data else data
+                self._reloads += 1
+            self._misses += 1
+
+        # Miss (or the profile changed underneath us): read outside the lock
+        loaded = self.backend.read(username)
+        if loaded is None:
+            with self._lock:
+                entry = self._cache.get(username)
+                if entry is not None and not entry.dirty:
+                    del self._cache[username]
+                    entry = None
+            return None if entry is None else entry.data
+        data, signature = loaded
+
+        with self._lock:
+            current = self._cache.get(username)
+            # A save() that raced with our read wins
+            if current is not None and current.dirty:
+                data = current.data
+            else:
+                self._remember(username, _Entry(data, signature))
+        return copy.deepcopy(data) if copy_data else data
+
+    def exists(self, username: str) -> bool:
+        with self._lock:
+            entry = self._cache.get(username)
+            if entry is not None and entry.dirty:
+                return True
+        return self.backend.signature(validate_username(username)) is not None
+
+    # ==================== WRITE ====================
+    def user_lock(self, username: str) -> threading.RLock:
+        """Held by save() and update(); hold it across a read-merge-save of one profile."""
+        return self._user_locks[hash(username) % USER_LOCK_STRIPES]
+
+    def update(self, username: str, fn: Callable[[Optional[Dict[str, Any]]], Optional[Dict[str, Any]]],
+               write_behind: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Read-modify-write without lost updates: fn gets a private copy of the
+        stored profile (None if there is none) and returns the profile to
+        save, or None to leave it alone. Returns what was saved.
+        """
+        with self.user_lock(username):
+            data = fn(self.get(username, copy_data=True))
+            if data is not None:
+                self.save(username, data, write_behind=write_behind)
+            return data
+
+    def save(self, username: str, data: Dict[str, Any], write_behind: bool = False):
+        """
+        Caches the profile and writes it to the backend atomically.
+        With write_behind=True the disk write happens in the background and
+        rapid saves of the same profile coalesce. The store owns `data`
+        afterwards; don't mutate it.
+        """
+        validate_username(username)
+        with self.user_lock(username):
+            with self._lock:
+                self._remember(username, _Entry(data, None, dirty=True))
+
+            if write_behind:
+                self._writer.schedule(username, data)
+                return
+
+        self._writer.write_through(username, data)
+
+    def invalidate(self, username: str):
+        with self._lock:
+            entry = self._cache.get(username)
+            if entry is not None and not entry.dirty:
+                del self._cache[username]
+
+    def flush(self):
+        self._writer.flush()
+
+    def shutdown(self):
+        self._writer.shutdown()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            stats = {
+                "backend": self.backend.name,
+                "cached": len(self._cache),
+                "hits": self._hits,
+                "misses": self._misses,
+                "reloads": self._reloads,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            }
+        stats["writes"] = self._writer.stats()
+        return stats
+
+
+# ==================== SHARED INSTANCE ====================
+_store: Optional[ProfileStore] = None
+_store_lock = threading.Lock()
+
+
+def get_profile_store() -> ProfileStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ProfileStore()
+        return _store
@@ -0,0 +1,137 @@
+"""
+Inverted index from normalized keyword -> projects (keyed by name).
+Lets apply_pipeline evaluate include/exclude tags with set operations
+instead of scanning every project's keywords for every tag. Indexes are
+kept per profile and only re-index the projects that changed.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Set, Tuple, Iterable
+
+# Profiles whose index we keep around between pipeline runs
+MAX_INDEXES = 256
+
+
+def project_keywords(project: Dict[str, Any]) -> Set[str]:
+    """
+    Lowercased tech_stack entries plus the words of the project name,
+    e.g. "react" matches a React project or one called "React Dashboard".
+    """
+    stack = project.get("tech_stack", [])
+    if isinstance(stack, str): stack = [stack]
+    keywords = {t.lower() for t in stack}
+    keywords.update(project.get("name", "").lower().split())
+    return keywords
+
+
+def _signature(project: Dict[str, Any]) -> Tuple:
+    stack = project.get("tech_stack", [])
+    if isinstance(stack, str): stack = [stack]
+    return (project.get("name", ""), tuple(stack))
+
+
+def _identities(projects: List[Dict[str, Any]]) -> List[Tuple[str, int]]:
+    """
+    Stable key per project: (full_name or name, occurrence), so inserting,
+    removing or reordering projects doesn't re-index the ones that moved.
+    """
+    seen: Dict[str, int] = {}
+    keys = []
+    for project in projects:
+        ident = str(project.get("full_name") or project.get("name", ""))
+        n = seen.get(ident, 0)
+        seen[ident] = n + 1
+        keys.append((ident, n))
+    return keys
+
+
+class ProjectTagIndex:
+    def __init__(self):
+        self._postings: Dict[str, Set[Tuple[str, int]]] = {}
+        self._signatures: Dict[Tuple[str, int], Tuple] = {}
+        self._keywords: Dict[Tuple[str, int], Set[str]] = {}
+        self._lock = threading.Lock()
+        self.reindexed = 0  # projects (re)indexed over this index's lifetime
+
+    def _remove(self, key: Tuple[str, int]):
+        for kw in self._keywords.pop(key, ()):
+            postings = self._postings.get(kw)
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del self._postings[kw]
+        self._signatures.pop(key, None)
+
+    def _add(self, key: Tuple[str, int], sig: Tuple, keywords: Set[str]):
+        self._signatures[key] = sig
+        self._keywords[key] = keywords
+        for kw in keywords:
+            self._postings.setdefault(kw, set()).add(key)
+
+    def _sync(self, projects: List[Dict[str, Any]]) -> List[Tuple[str, int]]:
+        """
+        Caller holds the lock. Re-indexes only projects that are new or whose
+        name/stack changed; returns each project's key, in list order.
+        """
+        keys = _identities(projects)
+        for key in set(self._signatures) - set(keys):
+            self._remove(key)
+
+        for key, project in zip(keys, projects):
+            sig = _signature(project)
+            if self._signatures.get(key) == sig:
+                continue
+            self._remove(key)
+            self._add(key, sig, project_keywords(project))
+            self.reindexed += 1
+        return keys
+
+    def _union(self, tags: Iterable[str]) -> Set[Tuple[str, int]]:
+        matched: Set[Tuple[str, int]] = set()
+        for tag in tags:
+            matched |= self._postings.get(tag.lower(), set())
+        return matched
+
+    def filter(self, projects: List[Dict[str, Any]], include_tags: List[str],
+               exclude_tags: List[str]) -> List[Dict[str, Any]]:
+        """
+        Same semantics as the original scan:
+        - drop a project if it has ANY exclude tag
+        - if include tags are given, keep it only if it has at least ONE
+        """
+        with self._lock:
+            keys = self._sync(projects)
+            included = self._union(include_tags) if include_tags else None
+            excluded = self._union(exclude_tags)
+        return [
+            project for key, project in zip(keys, projects)
+            if (included is None or key in included) and key not in excluded
+        ]
+
+
+# ==================== REGISTRY ====================
+_indexes: "OrderedDict[str, ProjectTagIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_project_index(key: str) -> ProjectTagIndex:
+    """Per-profile index, kept in a small LRU so hot profiles reuse theirs."""
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = ProjectTagIndex()
+            _indexes[key] = index
+            while len(_indexes) > MAX_INDEXES:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(key)
+        return index
+
+
+def index_stats() -> Dict[str, Any]:
+    with _indexes_lock:
+        return {
+            "profiles": len(_indexes),
+            "projects_reindexed": sum(i.reindexed for i in _indexes.values()),
+        }
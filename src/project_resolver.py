@@ -0,0 +1,198 @@
+"""
+Maps project names suggested by the gap analysis to a profile's projects.
+The LLM rarely repeats a repo name verbatim ("AI Resume Builder" for
+"ai-resume"), and a plain substring check picks the wrong project when
+names share a prefix. Names are indexed once per profile and matched in
+tiers, first hit wins:
+1. exact       - the name as written
+2. normalized  - case, separators and camelCase folded ("AI_Resume" == "ai-resume")
+3. token set   - same words in any order, or one project unambiguously
+                 contains the suggestion's words ("Resume" -> "ai-resume")
+                 or is contained in them ("AI Resume Builder" -> "ai-resume")
+4. fuzzy       - closest normalized name (difflib) among projects that
+                 share a word with the suggestion, strictly above FUZZY_CUTOFF;
+                 skipped when several projects contain all of its words, and
+                 a tie for closest is no match
+Suggestions that match nothing are reported instead of being dropped silently.
+"""
+
+import os
+import re
+import difflib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Sequence, Tuple, FrozenSet
+
+# ==================== CONFIG ====================
+FUZZY_CUTOFF = float(os.getenv("PROJECT_MATCH_CUTOFF", "0.8"))
+# Most candidates the fuzzy tier compares a suggestion against
+FUZZY_MAX_CANDIDATES = 50
+# Suggestions remembered per resolver
+MAX_RESOLVED = 1024
+# Profiles (distinct project name lists) whose index is kept
+RESOLVER_CACHE_SIZE = int(os.getenv("PROJECT_RESOLVER_CACHE_SIZE", "256"))
+
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_name(name: str) -> str:
+    """'MyCoolApp_v2' -> 'my cool app v2'"""
+    return _NON_WORD.sub(" ", _CAMEL.sub(" ", str(name)).lower()).strip()
+
+
+class ProjectResolver:
+    """Name index over one profile's projects; resolve() returns positions in `names`."""
+
+    TIERS = ("exact", "normalized", "token_set", "fuzzy")
+
+    def __init__(self, names: Sequence[str], fuzzy_cutoff: float = FUZZY_CUTOFF):
+        self.names = list(names)
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._exact: Dict[str, int] = {}
+        self._normalized: Dict[str, int] = {}
+        self._token_sets: Dict[FrozenSet[str], int] = {}
+        self._by_token: Dict[str, List[int]] = {}
+        self._norm_names: List[str] = []
+        self._tokens: List[FrozenSet[str]] = []
+        for pos, name in enumerate(self.names):
+            norm = normalize_name(name)
+            tokens = frozenset(norm.split())
+            self._norm_names.append(norm)
+            self._tokens.append(tokens)
+            # Duplicates resolve to the first project with that name
+            self._exact.setdefault(name, pos)
+            self._normalized.setdefault(norm, pos)
+            self._token_sets.setdefault(tokens, pos)
+            for token in tokens:
+                self._by_token.setdefault(token, []).append(pos)
+
+        self._resolved: Dict[str, Tuple[Optional[int], Optional[str]]] = {}  # suggestion -> (pos, tier)
+        self._lock = threading.Lock()
+        self._tier_counts = {tier: 0 for tier in self.TIERS}
+        self._unmatched = 0
+        self._cache_hits = 0
+
+    def _match(self, suggestion: str) -> Tuple[Optional[int], Optional[str]]:
+        if suggestion in self._exact:
+            return self._exact[suggestion], "exact"
+        norm = normalize_name(suggestion)
+        if not norm:
+            return None, None
+        if norm in self._normalized:
+            return self._normalized[norm], "normalized"
+
+        tokens = frozenset(norm.split())
+        if tokens in self._token_sets:
+            return self._token_sets[tokens], "token_set"
+        # Positions sharing at least one word, most shared words first
+        shared: Dict[int, int] = {}
+        for token in tokens:
+            for pos in self._by_token.get(token, ()):
+                shared[pos] = shared.get(pos, 0) + 1
+        containing = [pos for pos, n in shared.items() if n == len(tokens)]
+        if len(containing) == 1:
+            return containing[0], "token_set"
+        # Projects named entirely by words of the suggestion; the most specific one, if unique
+        contained = sorted((pos for pos, n in shared.items() if n == len(self._tokens[pos])),
+                           key=lambda pos: -len(self._tokens[pos]))
+        if contained and (len(contained) == 1 or len(self._tokens[contained[0]]) > len(self._tokens[contained[1]])):
+            return contained[0], "token_set"
+
+        if len(containing) > 1:
+            # Ambiguous ('Resume' with 'ai-resume' and 'ai-resume-backend'): don't let fuzzy pick
+            return None, None
+
+        candidates = sorted(shared, key=lambda pos: (-shared[pos], pos))[:FUZZY_MAX_CANDIDATES]
+        if not candidates and len(self.names) <= FUZZY_MAX_CANDIDATES:
+            # No shared words ('airesume' vs 'ai resume'): small profiles are cheap to scan
+            candidates = list(range(len(self.names)))
+        best, best_ratio, tied = None, self.fuzzy_cutoff, False
+        for pos in candidates:
+            matcher = difflib.SequenceMatcher(None, norm, self._norm_names[pos])
+            if matcher.real_quick_ratio() < best_ratio or matcher.quick_ratio() < best_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio > best_ratio:
+                best, best_ratio, tied = pos, ratio, False
+            elif ratio == best_ratio and best is not None:
+                tied = True
+        return (best, "fuzzy") if best is not None and not tied else (None, None)
+
+    def resolve(self, suggestion: str) -> Optional[int]:
+        """Position of the project `suggestion` refers to, or None."""
+        with self._lock:
+            if suggestion in self._resolved:
+                self._cache_hits += 1
+                return self._resolved[suggestion][0]
+        pos, tier = self._match(suggestion)
+        with self._lock:
+            if len(self._resolved) < MAX_RESOLVED:
+                self._resolved[suggestion] = (pos, tier)
+            if tier is None:
+                self._unmatched += 1
+            else:
+                self._tier_counts[tier] += 1
+        return pos
+
+    def order(self, suggestions: Sequence[str]) -> Tuple[List[int], List[str]]:
+        """
+        (positions in suggested order followed by the rest in original
+        order, suggestions that matched no project). A project suggested
+        twice keeps its first slot.
+        """
+        ordered: List[int] = []
+        taken = set()
+        unmatched: List[str] = []
+        for suggestion in suggestions:
+            pos = self.resolve(suggestion)
+            if pos is None:
+                unmatched.append(suggestion)
+            elif pos not in taken:
+                taken.add(pos)
+                ordered.append(pos)
+        ordered.extend(pos for pos in range(len(self.names)) if pos not in taken)
+        return ordered, unmatched
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "projects": len(self.names),
+                "resolved": len(self._resolved),
+                "cache_hits": self._cache_hits,
+                "unmatched": self._unmatched,
+                **{f"tier_{tier}": count for tier, count in self._tier_counts.items()},
+            }
+
+
+# ==================== SHARED INSTANCES ====================
+_resolvers: "OrderedDict[Tuple[str, ...], ProjectResolver]" = OrderedDict()
+_resolvers_lock = threading.Lock()
+
+
+def get_project_resolver(names: Sequence[str]) -> ProjectResolver:
+    """The resolver for this list of project names, built once and kept (LRU)."""
+    key = tuple(names)
+    with _resolvers_lock:
+        resolver = _resolvers.get(key)
+        if resolver is not None:
+            _resolvers.move_to_end(key)
+            return resolver
+    resolver = ProjectResolver(key)
+    with _resolvers_lock:
+        resolver = _resolvers.setdefault(key, resolver)
+        _resolvers.move_to_end(key)
+        while len(_resolvers) > RESOLVER_CACHE_SIZE:
+            _resolvers.popitem(last=False)
+    return resolver
+
+
+def resolve_project_order(projects: List[Dict[str, Any]], suggestions: Sequence[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """(projects with the suggested ones first, suggestions that matched nothing)"""
+    # None / "" entries from the LLM are noise, not unmatched names
+    suggestions = [str(s) for s in suggestions or () if s]
+    if not suggestions:
+        return list(projects), []
+    resolver = get_project_resolver([str(p.get('name', '')) for p in projects])
+    positions, unmatched = resolver.order(suggestions)
+    return [projects[pos] for pos in positions], unmatched
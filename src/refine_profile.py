@@ -1,9 +1,18 @@
-import json
 import os
+import ast
+import json
+import time
+import argparse
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_google_genai import ChatGoogleGenerativeAI
-from src.schemas import UserProfile
+try:
+    from src.schemas import UserProfile, Project, RefinementBatch, project_fingerprint, needs_refinement
+    from src.profile_store import get_profile_store
+except ModuleNotFoundError:
+    from schemas import UserProfile, Project, RefinementBatch, project_fingerprint, needs_refinement
+    from profile_store import get_profile_store
 
 # 1. Setup
 load_dotenv()
@@ -14,6 +23,13 @@ if not os.getenv("GOOGLE_API_KEY"):
 # Use the model that worked for you earlier
 llm = ChatGoogleGenerativeAI(model="gemini-flash-latest")
 
+# Projects packed into one prompt (1 = one call per project)
+REFINE_BATCH_SIZE = int(os.getenv("REFINE_BATCH_SIZE", "6"))
+# LLM calls in flight at once
+REFINE_CONCURRENCY = int(os.getenv("REFINE_CONCURRENCY", "4"))
+# Extra single-project attempts for projects a batch didn't deliver
+REFINE_RETRIES = int(os.getenv("REFINE_RETRIES", "2"))
+
 # 2. Define the "Impact" Prompt
 # This tells the AI how to turn boring text into "Resume Gold"
 impact_prompt = ChatPromptTemplate.from_template("""
@@ -29,61 +45,190 @@ Instructions:
 1. Generate 2-3 bullet points using the "STAR" method (Situation, Task, Action, Result).
 2. Use strong action verbs (Architected, Deployed, Optimized).
 3. IF the description is vague, infer logical technical details based on the tech stack (e.g., if "Python/Django", mention "REST APIs").
-4. Return ONLY the bullet points as a Python list of strings. Do not output Markdown or explanations.
+4. Return ONLY the bullet points as a JSON list of strings. Do not output Markdown or explanations.
 
 Example Output format:
 ["Built a high-concurrency payment engine...", "Reduced database query time by 30%..."]
 """)
 
-def refine_user_profile():
-    # 3. Load the Raw Data
+# Same instructions, several projects per call, answered as JSON we can validate
+batch_prompt = ChatPromptTemplate.from_template("""
+You are an expert Resume Writer and Technical Recruiter.
+Rewrite each GitHub project below into high-impact "Resume Bullets".
+
+Input Projects (JSON):
+{projects}
+
+Instructions:
+1. For EACH project, generate 2-3 bullet points using the "STAR" method (Situation, Task, Action, Result).
+2. Use strong action verbs (Architected, Deployed, Optimized).
+3. IF a description is vague, infer logical technical details based on its tech stack.
+4. Return ONLY a JSON object, no Markdown or explanations, exactly in this shape:
+{{"projects": [{{"id": <project id>, "bullets": ["...", "..."]}}]}}
+""")
+
+
+# 3. Response Parsing (no eval: the model's output is untrusted)
+def _response_text(response) -> str:
+    """Message content as text; chat models may answer with a list of parts."""
+    content = response.content
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            p if isinstance(p, str) else str(p.get("text", "")) if isinstance(p, dict) else str(p)
+            for p in content
+        )
+    return "" if content is None else str(content)
+
+def _strip_fences(text: str) -> str:
+    return text.replace("```json", "").replace("```python", "").replace("```", "").strip()
+
+def parse_bullets(text: str) -> List[str]:
+    """A JSON (or Python-literal) list of strings; anything else becomes one bullet, empty text none."""
+    text = _strip_fences(text)
+    if not text:
+        return []
+    if text.startswith("[") and text.endswith("]"):
+        for parse in (json.loads, ast.literal_eval):
+            try:
+                value = parse(text)
+            except (ValueError, SyntaxError):
+                continue
+            if isinstance(value, list) and value and all(isinstance(b, str) for b in value):
+                return [b.strip() for b in value if b.strip()]
+    return [text]
+
+def parse_batch(text: str, batch_size: int) -> Dict[int, List[str]]:
+    """Validated {batch position: bullets}; ids outside the batch are ignored."""
+    batch = RefinementBatch.model_validate_json(_strip_fences(text))
+    return {
+        item.id: [b.strip() for b in item.bullets if b.strip()]
+        for item in batch.projects
+        if 0 <= item.id < batch_size and any(b.strip() for b in item.bullets)
+    }
+
+
+# 4. Refinement
+def _project_input(project: Project) -> Dict[str, str]:
+    return {"name": project.name, "tech": ", ".join(project.tech_stack), "desc": project.description_raw}
+
+def refine_projects(projects: List[Project], batch_size: int = REFINE_BATCH_SIZE,
+                    concurrency: int = REFINE_CONCURRENCY, retries: int = REFINE_RETRIES) -> Dict[int, List[str]]:
+    """
+    Bullets for each project, keyed by its position in `projects`.
+    Batches go out concurrently; projects a batch failed to deliver
+    (bad JSON, missing ids, errors) are retried one call each.
+    Projects that still fail are left out of the result.
+    """
+    results: Dict[int, List[str]] = {}
+    config = {"max_concurrency": max(concurrency, 1)}
+    pending = list(range(len(projects)))
+    batched = batch_size > 1 and len(pending) > 1
+
+    if batched:
+        groups = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        inputs = [
+            {"projects": json.dumps([{"id": n, **_project_input(projects[pos])} for n, pos in enumerate(group)], indent=2)}
+            for group in groups
+        ]
+        responses = (batch_prompt | llm).batch(inputs, config=config, return_exceptions=True)
+        for group, response in zip(groups, responses):
+            if isinstance(response, Exception):
+                print(f"   ⚠️ Batch of {len(group)} failed: {response}")
+                continue
+            try:
+                bullets = parse_batch(_response_text(response), len(group))
+            except Exception as e:
+                # Whatever went wrong, these projects fall through to the single-project retries
+                print(f"   ⚠️ Batch of {len(group)} returned invalid JSON: {e}")
+                continue
+            for n, pos in enumerate(group):
+                if n in bullets:
+                    results[pos] = bullets[n]
+        pending = [pos for pos in pending if pos not in results]
+        if pending:
+            print(f"   🔁 Retrying {len(pending)} project(s) individually...")
+
+    # Single-project calls: the first pass when not batching, plus retries
+    attempts = max(retries, 1) if batched else retries + 1
+    chain = impact_prompt | llm
+    for _ in range(attempts):
+        if not pending:
+            break
+        responses = chain.batch([_project_input(projects[pos]) for pos in pending], config=config, return_exceptions=True)
+        failed = []
+        for pos, response in zip(pending, responses):
+            if isinstance(response, Exception):
+                print(f"   ⚠️ Failed to refine {projects[pos].name}: {response}")
+                failed.append(pos)
+                continue
+            try:
+                bullets = parse_bullets(_response_text(response))
+            except Exception as e:
+                bullets = []
+                print(f"   ⚠️ Unreadable answer for {projects[pos].name}: {e}")
+            if bullets:
+                results[pos] = bullets
+            else:
+                failed.append(pos)
+        pending = failed
+    return results
+
+def refine_user_profile(username: Optional[str] = None, batch_size: int = REFINE_BATCH_SIZE,
+                        concurrency: int = REFINE_CONCURRENCY, force: bool = False):
+    # 5. Load the Raw Data (a stored GitHub profile, or the legacy data/profile.json)
+    store = get_profile_store()
     try:
-        with open("data/profile.json", "r") as f:
-            data = json.load(f)
-            # Validate it with our Schema
-            profile = UserProfile(**data)
+        if username:
+            data = store.get(username, copy_data=True)
+            if data is None:
+                raise FileNotFoundError(store.location(username))
+        else:
+            with open("data/profile.json", "r") as f:
+                data = json.load(f)
+        # Validate it with our Schema
+        profile = UserProfile(**data)
     except FileNotFoundError:
-        print("❌ Error: profile.json not found. Run fetch_github.py first!")
+        print("❌ Error: profile not found. Run fetch_github.py first!")
         return
 
-    print(f"🚀 Starting Impact Refinement for {profile.full_name}...\n")
-
-    # 4. Iterate through Projects and "Upgrade" them
-    for project in profile.projects:
-        print(f"⚡ Improving: {project.name}...")
-        
-        # Prepare the input for AI
-        chain = impact_prompt | llm
-        
-        try:
-            # Ask AI to rewrite
-            response = chain.invoke({
-                "name": project.name,
-                "tech": ", ".join(project.tech_stack),
-                "desc": project.description_raw
-            })
-            
-            # Clean up the response to get a real list
-            # (AI sometimes returns text, we want to parse it into a list)
-            refined_text = response.content.strip()
-            
-            # Simple parser to turn string representation into actual list
-            if refined_text.startswith("[") and refined_text.endswith("]"):
-                project.refined_bullets = eval(refined_text)
-            else:
-                # Fallback if AI didn't format perfectly
-                project.refined_bullets = [refined_text]
-                
-            print(f"   ✅ Generated {len(project.refined_bullets)} impact bullets.")
-            
-        except Exception as e:
-            print(f"   ⚠️ Failed to refine {project.name}: {e}")
-
-    # 5. Save the "Golden" Profile
-    with open("data/profile.json", "w") as f:
-        f.write(profile.model_dump_json(indent=2))
-    
-    print("\n✨ SUCCESS! Your 'profile.json' now contains professional resume bullets.")
+    # 6. Only projects whose inputs changed since their last refinement
+    targets = [p for p in profile.projects if force or needs_refinement(p)]
+    skipped = len(profile.projects) - len(targets)
+    if not targets:
+        print(f"✅ All {len(profile.projects)} projects of {profile.full_name} are up to date.")
+        return
+
+    print(f"🚀 Starting Impact Refinement for {profile.full_name} "
+          f"({len(targets)} projects, {skipped} unchanged, batches of {batch_size}, {concurrency} in flight)...\n")
+
+    # 7. "Upgrade" them
+    started = time.monotonic()
+    refined = refine_projects(targets, batch_size=batch_size, concurrency=concurrency)
+    for pos, project in enumerate(targets):
+        if pos in refined:
+            project.refined_bullets = refined[pos]
+            project.is_refined = True
+            project.refined_fingerprint = project_fingerprint(project)
+            print(f"   ✅ {project.name}: {len(project.refined_bullets)} impact bullets.")
+    print(f"\n⏱️ Refined {len(refined)}/{len(targets)} projects in {time.monotonic() - started:.1f}s")
+
+    # 8. Save the "Golden" Profile
+    if username:
+        store.save(username, profile.model_dump())
+        print(f"\n✨ SUCCESS! Saved refined bullets to '{store.location(username)}'.")
+    else:
+        with open("data/profile.json", "w") as f:
+            f.write(profile.model_dump_json(indent=2))
+        print("\n✨ SUCCESS! Your 'profile.json' now contains professional resume bullets.")
 
 if __name__ == "__main__":
-    refine_user_profile()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Rewrite project descriptions into resume bullets")
+    parser.add_argument("username", nargs="?", help="Stored GitHub profile to refine (default: data/profile.json)")
+    parser.add_argument("--batch-size", type=int, default=REFINE_BATCH_SIZE, help="Projects per LLM call (1 = one call each)")
+    parser.add_argument("--concurrency", type=int, default=REFINE_CONCURRENCY, help="LLM calls in flight at once")
+    parser.add_argument("--force", action="store_true", help="Re-refine projects even if their inputs are unchanged")
+    args = parser.parse_args()
+    refine_user_profile(args.username, batch_size=max(args.batch_size, 1), concurrency=args.concurrency,
+                        force=args.force)
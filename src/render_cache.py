@@ -0,0 +1,200 @@
+"""
+Content-addressed cache for rendered PDFs.
+Identical Typst source (+ template + font set) always compiles to the same
+bytes, so repeat renders are served from memory or 'output/render_cache/'
+instead of going back to the compiler.
+"""
+
+import os
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+# ==================== CONFIG ====================
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+CACHE_DIR = os.path.join(PROJECT_ROOT, "output", "render_cache")
+MEMORY_LIMIT_BYTES = int(float(os.getenv("RENDER_CACHE_MEMORY_MB", "64")) * 1024 * 1024)
+DISK_LIMIT_BYTES = int(float(os.getenv("RENDER_CACHE_DISK_MB", "512")) * 1024 * 1024)
+
+
+def font_set_fingerprint() -> str:
+    """
+    Identifies the fonts a compile can see. Changing the typst version or
+    the configured font paths must not serve PDFs rendered with old fonts.
+    """
+    try:
+        from importlib.metadata import version
+        typst_version = version("typst")
+    except Exception:
+        typst_version = "unknown"
+    font_paths = os.getenv("TYPST_FONT_PATHS", "")
+    system = "no-system" if os.getenv("TYPST_IGNORE_SYSTEM_FONTS", "0") == "1" else "system"
+    return f"typst={typst_version};fonts={system}:{font_paths}"
+
+
+def render_key(typst_code: str, template_id: str = "modern", font_set: Optional[str] = None) -> str:
+    """SHA-256 over everything that can change the rendered bytes."""
+    h = hashlib.sha256()
+    for part in (template_id, font_set or font_set_fingerprint(), typst_code):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class RenderCache:
+    """
+    Two tiers, both LRU with a byte budget:
+    1. In-memory OrderedDict of key -> PDF bytes.
+    2. On-disk '<key>.pdf' files; recency is tracked through mtime.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR,
+                 memory_limit: int = MEMORY_LIMIT_BYTES,
+                 disk_limit: int = DISK_LIMIT_BYTES):
+        self.cache_dir = cache_dir
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self._lock = threading.Lock()
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()  # key -> size
+        self._disk_bytes = 0
+
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        self._load_disk_index()
+
+    # --- DISK INDEX ---
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def _load_disk_index(self):
+        """Rebuilds the disk LRU from whatever survived the last run."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".pdf"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+        self._evict_disk()
+
+    # --- EVICTION (caller holds the lock) ---
+    def _evict_memory(self):
+        while self._memory_bytes > self.memory_limit and self._memory:
+            _, pdf = self._memory.popitem(last=False)
+            self._memory_bytes -= len(pdf)
+            self._evictions += 1
+
+    def _evict_disk(self):
+        while self._disk_bytes > self.disk_limit and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self._evictions += 1
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def _remember(self, key: str, pdf: bytes):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        if len(pdf) > self.memory_limit:
+            return
+        self._memory[key] = pdf
+        self._memory_bytes += len(pdf)
+        self._evict_memory()
+
+    # --- PUBLIC API ---
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            pdf = self._memory.get(key)
+            if pdf is not None:
+                self._memory.move_to_end(key)
+                self._memory_hits += 1
+                return pdf
+            on_disk = key in self._disk
+
+        if on_disk:
+            try:
+                with open(self._path(key), "rb") as f:
+                    pdf = f.read()
+                os.utime(self._path(key))
+            except FileNotFoundError:
+                pdf = None
+
+        with self._lock:
+            if pdf is None:
+                if key in self._disk:
+                    self._disk_bytes -= self._disk.pop(key)
+                self._misses += 1
+                return None
+            if key in self._disk:
+                self._disk.move_to_end(key)
+            self._disk_hits += 1
+            self._remember(key, pdf)
+            return pdf
+
+    def put(self, key: str, pdf: bytes):
+        with self._lock:
+            self._remember(key, pdf)
+            if key in self._disk:
+                self._disk.move_to_end(key)
+                return
+
+        # Write outside the lock; os.replace makes it visible atomically
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(pdf)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"⚠️ Render cache write failed: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            if key not in self._disk:
+                self._disk[key] = len(pdf)
+                self._disk_bytes += len(pdf)
+            self._evict_disk()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._memory_hits + self._disk_hits + self._misses
+            hits = self._memory_hits + self._disk_hits
+            return {
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
+
+
+# ==================== SHARED INSTANCE ====================
+_cache: Optional[RenderCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> RenderCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RenderCache()
+        return _cache
@@ -0,0 +1,234 @@
+"""
+tech_stack enrichment for fetched repos.
+A repo's primary `language` misses most of what it uses, so for the
+projects that make it into a profile we also pull:
+- the language breakdown (/repos/{repo}/languages),
+- the repo topics (already part of the repo listing),
+- optionally, frameworks named in dependency manifests
+  (package.json, requirements.txt, pyproject.toml, go.mod, Cargo.toml).
+Results are cached per repo and `pushed_at`, so a profile refresh only
+queries repos that have been pushed to since the last fetch.
+"""
+
+import os
+import re
+import json
+import time
+import base64
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+try:
+    from src.github_client import GitHubClient, GitHubError, GitHubNotFound, get_github_client, CACHE_PATH, GITHUB_TOKEN
+except ModuleNotFoundError:
+    from github_client import GitHubClient, GitHubError, GitHubNotFound, get_github_client, CACHE_PATH, GITHUB_TOKEN
+
+# ==================== CONFIG ====================
+# Up to one extra call per top repo: on by default only with a token
+# (unauthenticated GitHub allows 60 calls an hour)
+ENRICH_REPOS = os.getenv("GITHUB_ENRICH", "1" if GITHUB_TOKEN else "0") != "0"
+DETECT_FRAMEWORKS = os.getenv("GITHUB_DETECT_FRAMEWORKS", "0") == "1"
+ENRICH_WORKERS = int(os.getenv("GITHUB_ENRICH_WORKERS", "8"))
+# Languages below this share of a repo's bytes are left out
+MIN_LANGUAGE_SHARE = 0.05
+# Bump when detection changes so cached results are recomputed
+ENRICHMENT_VERSION = "v1"
+
+# Dependency name (lowercase) -> skill, per manifest
+FRAMEWORK_MARKERS: Dict[str, Dict[str, str]] = {
+    "package.json": {
+        "react": "React", "next": "Next.js", "vue": "Vue", "@angular/core": "Angular",
+        "svelte": "Svelte", "express": "Express", "tailwindcss": "Tailwind CSS",
+        "typescript": "TypeScript", "graphql": "GraphQL", "prisma": "Prisma",
+        "mongoose": "MongoDB", "socket.io": "WebSocket", "electron": "Electron",
+        "react-native": "React Native", "jest": "Jest",
+    },
+    "requirements.txt": {
+        "django": "Django", "flask": "Flask", "fastapi": "FastAPI", "pandas": "Pandas",
+        "numpy": "NumPy", "torch": "PyTorch", "tensorflow": "TensorFlow", "keras": "Keras",
+        "scikit-learn": "scikit-learn", "langchain": "LangChain", "sqlalchemy": "SQLAlchemy",
+        "celery": "Celery", "opencv-python": "OpenCV", "streamlit": "Streamlit", "pytest": "pytest",
+    },
+    "go.mod": {
+        "github.com/gin-gonic/gin": "Gin", "github.com/gofiber/fiber": "Fiber",
+        "google.golang.org/grpc": "gRPC", "gorm.io/gorm": "GORM",
+    },
+    "Cargo.toml": {
+        "tokio": "Tokio", "actix-web": "Actix", "axum": "Axum", "serde": "Serde", "rocket": "Rocket",
+    },
+}
+# pyproject.toml lists the same packages as requirements.txt
+FRAMEWORK_MARKERS["pyproject.toml"] = FRAMEWORK_MARKERS["requirements.txt"]
+
+_DEP_NAME = re.compile(r"[A-Za-z0-9@/._-]+")
+
+
+class EnrichmentCache:
+    """(repo full_name, pushed_at) -> enrichment, in the GitHub cache database."""
+
+    def __init__(self, db_path: str = CACHE_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS repo_enrichment (
+                full_name TEXT NOT NULL,
+                options TEXT NOT NULL,
+                pushed_at TEXT,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (full_name, options)
+            )
+        """)
+        conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            self._local.conn = conn
+        return conn
+
+    def get(self, full_name: str, options: str, pushed_at: Optional[str]) -> Optional[Dict[str, List[str]]]:
+        row = self._connect().execute(
+            "SELECT pushed_at, data FROM repo_enrichment WHERE full_name = ? AND options = ?",
+            (full_name, options),
+        ).fetchone()
+        if row is None or pushed_at is None or row[0] != pushed_at:
+            return None
+        return json.loads(row[1])
+
+    def put(self, full_name: str, options: str, pushed_at: Optional[str], data: Dict[str, List[str]]):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO repo_enrichment (full_name, options, pushed_at, data, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (full_name, options, pushed_at, json.dumps(data), time.time()),
+            )
+
+
+# ==================== DETECTION ====================
+def _manifest_dependencies(filename: str, text: str) -> List[str]:
+    """Lowercased dependency names from a manifest (best effort, no TOML parser needed)."""
+    if filename == "package.json":
+        try:
+            manifest = json.loads(text)
+        except ValueError:
+            return []
+        deps = {}
+        for section in ("dependencies", "devDependencies", "peerDependencies"):
+            deps.update(manifest.get(section) or {})
+        return [name.lower() for name in deps]
+    names = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip().strip('",')
+        if not line or line.startswith("["):
+            continue
+        if filename == "go.mod":
+            line = line.removeprefix("require").strip().strip("(")
+        match = _DEP_NAME.match(line)
+        if match:
+            # "flask>=2.0" -> flask, "torch[cpu]" -> torch, "serde = ..." -> serde
+            names.append(re.split(r"[<>=!~\[ ;]", match.group(0), 1)[0].lower())
+    return names
+
+
+def _detect_frameworks(client: GitHubClient, full_name: str) -> List[str]:
+    found: List[str] = []
+    for filename, markers in FRAMEWORK_MARKERS.items():
+        try:
+            meta, _ = client.get_json(f"repos/{full_name}/contents/{filename}")
+        except GitHubNotFound:
+            continue
+        if not isinstance(meta, dict) or meta.get("encoding") != "base64":
+            continue
+        text = base64.b64decode(meta.get("content", "")).decode("utf-8", errors="replace")
+        for dep in _manifest_dependencies(filename, text):
+            skill = markers.get(dep)
+            if skill and skill not in found:
+                found.append(skill)
+    return found
+
+
+def enrich_repo(client: GitHubClient, repo: Dict[str, Any], detect_frameworks: bool = DETECT_FRAMEWORKS) -> Dict[str, List[str]]:
+    full_name = repo["full_name"]
+    breakdown, _ = client.get_json(f"repos/{full_name}/languages")
+    total = sum(breakdown.values()) or 1
+    languages = [
+        lang for lang, size in sorted(breakdown.items(), key=lambda kv: -kv[1])
+        if size / total >= MIN_LANGUAGE_SHARE
+    ]
+    return {
+        "languages": languages,
+        "topics": list(repo.get("topics") or []),
+        "frameworks": _detect_frameworks(client, full_name) if detect_frameworks else [],
+    }
+
+
+def tech_stack_for(repo: Dict[str, Any], enrichment: Optional[Dict[str, List[str]]]) -> List[str]:
+    """Primary language first, then other languages, frameworks and topics (deduplicated)."""
+    candidates = [repo.get("language")]
+    if enrichment:
+        candidates += enrichment["languages"] + enrichment["frameworks"] + enrichment["topics"]
+    stack: List[str] = []
+    seen = set()
+    for tech in candidates:
+        if tech and tech.lower() not in seen:
+            seen.add(tech.lower())
+            stack.append(tech)
+    return stack
+
+
+# ==================== PUBLIC API ====================
+_cache: Optional[EnrichmentCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_enrichment_cache() -> EnrichmentCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EnrichmentCache()
+        return _cache
+
+
+def enrich_repos(repos: List[Dict[str, Any]], detect_frameworks: bool = DETECT_FRAMEWORKS,
+                 workers: int = ENRICH_WORKERS, client: Optional[GitHubClient] = None,
+                 cache: Optional[EnrichmentCache] = None) -> Dict[str, Optional[Dict[str, List[str]]]]:
+    """
+    full_name -> enrichment for each repo (None if it couldn't be fetched).
+    Repos whose pushed_at matches the cache cost no API calls; the rest
+    are queried concurrently on a bounded pool.
+    """
+    client = client or get_github_client()
+    cache = cache or get_enrichment_cache()
+    options = f"{ENRICHMENT_VERSION}|frameworks={int(detect_frameworks)}"
+
+    results: Dict[str, Optional[Dict[str, List[str]]]] = {}
+    misses = []
+    for repo in repos:
+        cached = cache.get(repo["full_name"], options, repo.get("pushed_at"))
+        if cached is not None:
+            results[repo["full_name"]] = cached
+        else:
+            misses.append(repo)
+    if not misses:
+        return results
+
+    def work(repo: Dict[str, Any]):
+        try:
+            data = enrich_repo(client, repo, detect_frameworks)
+        except GitHubError as e:
+            print(f"⚠️ Could not enrich {repo['full_name']}: {e}")
+            return repo, None
+        cache.put(repo["full_name"], options, repo.get("pushed_at"), data)
+        return repo, data
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(misses))), thread_name_prefix="enrich") as pool:
+        for repo, data in pool.map(work, misses):
+            results[repo["full_name"]] = data
+    return results
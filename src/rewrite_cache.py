@@ -0,0 +1,145 @@
+"""
+Cache and request coalescing for /rewrite.
+Inputs are normalized (whitespace, case) before keying, so double-clicks
+and retries of the same notes reuse the earlier answer until it expires.
+Concurrent identical requests share one in-flight LLM call (single-flight):
+the first caller runs it, the rest wait on its Future.
+"""
+
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Any, Callable, Optional, Tuple
+
+# ==================== CONFIG ====================
+REWRITE_CACHE_TTL_S = float(os.getenv("REWRITE_CACHE_TTL", "3600"))
+REWRITE_CACHE_SIZE = int(os.getenv("REWRITE_CACHE_SIZE", "1024"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def rewrite_key(text: str, model: str = "") -> str:
+    normalized = _WHITESPACE.sub(" ", text).strip().casefold()
+    return hashlib.sha256(f"{model}|{normalized}".encode("utf-8")).hexdigest()
+
+
+class RewriteCache:
+    def __init__(self, ttl_s: float = REWRITE_CACHE_TTL_S, max_entries: int = REWRITE_CACHE_SIZE):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()  # key -> (expires_at, text)
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._llm_calls = 0
+        self._expired = 0
+        self._evictions = 0
+
+    def _get_locked(self, key: str) -> Optional[str]:
+        """Caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, text = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self._expired += 1
+            return None
+        self._entries.move_to_end(key)
+        return text
+
+    def begin(self, key: str) -> Tuple[Optional[str], Optional[Future], bool]:
+        """
+        Returns (cached_text, future, is_leader):
+        - cached text if there is a fresh answer,
+        - otherwise the in-flight Future for this key; is_leader=True means
+          the caller must produce the answer and call finish().
+        """
+        with self._lock:
+            text = self._get_locked(key)
+            if text is not None:
+                self._hits += 1
+                return text, None, False
+            future = self._inflight.get(key)
+            if future is not None:
+                self._coalesced += 1
+                return None, future, False
+            self._misses += 1
+            self._llm_calls += 1
+            future = Future()
+            self._inflight[key] = future
+            return None, future, True
+
+    def finish(self, key: str, future: Future, text: Optional[str] = None,
+               error: Optional[BaseException] = None):
+        """Leader only: publishes the result to waiters and caches successes."""
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            if error is None and text:
+                self._entries[key] = (time.monotonic() + self.ttl_s, text)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(text)
+
+    def run(self, key: str, produce: Callable[[], str]) -> str:
+        """Blocking single-flight: cached answer, someone else's call, or our own."""
+        while True:
+            cached, future, leader = self.begin(key)
+            if cached is not None:
+                return cached
+            if leader:
+                break
+            try:
+                return future.result()
+            except ConnectionAbortedError:
+                # The leader was a stream whose client went away; that's not
+                # our failure, so take over the call (as /rewrite/stream does)
+                continue
+        try:
+            text = produce()
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, text=text)
+        return text
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = self._hits + self._misses + self._coalesced
+            return {
+                "entries": len(self._entries),
+                "in_flight": len(self._inflight),
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "llm_calls": self._llm_calls,
+                "llm_calls_saved": self._hits + self._coalesced,
+                "hit_rate": round((self._hits + self._coalesced) / requests, 3) if requests else 0.0,
+                "expired": self._expired,
+                "evictions": self._evictions,
+            }
+
+
+# ==================== SHARED INSTANCE ====================
+_cache: Optional[RewriteCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_rewrite_cache() -> RewriteCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RewriteCache()
+        return _cache
@@ -1,5 +1,7 @@
+import json
+import hashlib
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 # --- EXISTING MODELS (unchanged) ---
 
@@ -24,6 +26,35 @@ class Project(BaseModel):
     # CRITICAL: Logic flag for LangGraph to know if this project is "Done"
     is_refined: bool = False 
 
+    # project_fingerprint() of the inputs the current bullets were written from
+    refined_fingerprint: Optional[str] = None
+
+# Inputs that shape a project's bullets; editing any of them calls for a re-refine
+REFINEMENT_INPUTS = ("name", "tech_stack", "description_raw", "metrics_raw")
+
+def project_fingerprint(project: Union[Project, Dict[str, Any]]) -> str:
+    data = project.model_dump() if isinstance(project, BaseModel) else project
+    inputs = {field: data.get(field) for field in REFINEMENT_INPUTS}
+    inputs["tech_stack"] = list(inputs["tech_stack"] or [])
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+def needs_refinement(project: Union[Project, Dict[str, Any]]) -> bool:
+    """
+    True if the project was never refined or its inputs changed since.
+    Projects refined before fingerprints existed count as up to date.
+    """
+    data = project.model_dump() if isinstance(project, BaseModel) else project
+    if not data.get("is_refined"):
+        return True
+    stored = data.get("refined_fingerprint")
+    return stored is not None and stored != project_fingerprint(data)
+
+def mark_refined(project: Dict[str, Any], bullets: List[str]):
+    """Stores bullets on a project dict and stamps the inputs they came from."""
+    project["refined_bullets"] = bullets
+    project["is_refined"] = True
+    project["refined_fingerprint"] = project_fingerprint(project)
+
 class WorkExperience(BaseModel):
     company: str
     role: str
@@ -38,6 +69,13 @@ class WorkExperience(BaseModel):
     # CRITICAL: Logic flag for LangGraph
     is_refined: bool = False
 
+class Education(BaseModel):
+    institution: str
+    degree: str = ""
+    start_date: str = ""
+    end_date: str = ""
+    details: str = "" # e.g. GPA, honours, coursework
+
 class SkillGap(BaseModel):
     missing_skill: str
     recommendation: str  # e.g. "Build a small project using Terraform"
@@ -71,6 +109,17 @@ class GapAnalysis(BaseModel):
     critique: str # A 2-sentence summary from the "Hiring Manager"
 
 
+# --- BATCH REFINEMENT (LLM response schema) ---
+
+class RefinedProject(BaseModel):
+    """Bullets for one project in a batched refinement answer."""
+    id: int # Position of the project in the batch prompt
+    bullets: List[str] = Field(min_length=1)
+
+class RefinementBatch(BaseModel):
+    projects: List[RefinedProject]
+
+
 # --- UPDATED USER PROFILE ---
 
 class UserProfile(BaseModel):
@@ -82,6 +131,7 @@ class UserProfile(BaseModel):
     # The Database of your career
     projects: List[Project] = []
     experience: List[WorkExperience] = []
+    education: List[Education] = []
     skills: List[str] = []
     
     # --- The "Gap Analysis" Storage ---
@@ -89,4 +139,9 @@ class UserProfile(BaseModel):
     
     # PHASE 4 ADDITION: 
     # Store the specific analysis for the current target job
-    job_match_analysis: Optional[GapAnalysis] = None
\ No newline at end of file
+    job_match_analysis: Optional[GapAnalysis] = None
+
+    # Epoch seconds of the last GitHub fetch (drives background refresh)
+    fetched_at: Optional[float] = None
+    # Optional per-profile refresh interval in seconds (overrides the adaptive one)
+    refresh_ttl_s: Optional[float] = None
\ No newline at end of file
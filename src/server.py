@@ -6,7 +6,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Initialize the Brain
-llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash")
+REWRITE_MODEL = "gemini-1.5-flash"
+llm = ChatGoogleGenerativeAI(model=REWRITE_MODEL)
 
 # --- 1. PATH FIX ---
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -14,35 +15,101 @@ project_root = os.path.abspath(os.path.join(current_dir, '..'))
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Literal
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import io
+import re
+import asyncio
 import json
+import time
+import zipfile
 import logging
 
 # --- IMPORTS ---
 try:
-    from src.tools import generate_resume_pdf
-    from src.gap_analyzer import analyze_job_match
-    from src.builder import build_typst_code
+    from src.tools import render_document, warm_up_renderer
+    from src.template_renderer import ResumeDocument, build_resume
+    from src.typst_engine import get_engine, shutdown_engine, CompileError, CompileQueueFull, COMPILE_TIMEOUT_S
+    from src.render_cache import get_render_cache
+    from src.jobs import Job, JobManager, JobQueueFull, DONE, FAILED
+    from src.gap_analyzer import analyze_job_match, analyze_job_matches
+    from src.analysis_cache import get_analysis_cache
+    from src.builder import order_projects, rank_projects, fragment_cache_stats
     from src.fetch_github import fetch_github_profile 
+    from src.github_client import get_github_client
     from src.auth import router as auth_router
     # New Import
-    from src.schemas import PipelineConfig
+    from src.schemas import PipelineConfig, UserProfile
+    from src.project_index import ProjectTagIndex, get_project_index, index_stats
+    from src.profile_store import get_profile_store
+    from src.storage import validate_username
+    from src.profile_refresher import get_profile_refresher, REFRESH_ENABLED
+    from src.rewrite_cache import get_rewrite_cache, rewrite_key
 except ModuleNotFoundError:
-    from tools import generate_resume_pdf
-    from gap_analyzer import analyze_job_match
-    from builder import build_typst_code
+    from tools import render_document, warm_up_renderer
+    from template_renderer import ResumeDocument, build_resume
+    from typst_engine import get_engine, shutdown_engine, CompileError, CompileQueueFull, COMPILE_TIMEOUT_S
+    from render_cache import get_render_cache
+    from jobs import Job, JobManager, JobQueueFull, DONE, FAILED
+    from gap_analyzer import analyze_job_match, analyze_job_matches
+    from analysis_cache import get_analysis_cache
+    from builder import order_projects, rank_projects, fragment_cache_stats
     from fetch_github import fetch_github_profile
+    from github_client import get_github_client
     from auth import router as auth_router
-    from schemas import PipelineConfig
+    from schemas import PipelineConfig, UserProfile
+    from project_index import ProjectTagIndex, get_project_index, index_stats
+    from profile_store import get_profile_store
+    from storage import validate_username
+    from profile_refresher import get_profile_refresher, REFRESH_ENABLED
+    from rewrite_cache import get_rewrite_cache, rewrite_key
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="AI Resume Backend")
+# Background runner for /generate/async
+job_manager = JobManager()
+
+# Profiles posted to /generate are saved in the background
+PERSIST_PROFILES = os.getenv("PERSIST_PROFILES", "1") != "0"
+profile_store = get_profile_store()
+# Re-fetches stale GitHub profiles off the request path
+profile_refresher = get_profile_refresher()
+
+# Variants of one /generate/multi request rendered at the same time
+MULTI_MAX_PARALLEL = int(os.getenv("GENERATE_MULTI_PARALLEL", "8"))
+
+# Gap analysis runs beside the speculative compile
+ANALYSIS_DEADLINE_S = float(os.getenv("ANALYSIS_DEADLINE_S", "25"))
+analysis_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("ANALYSIS_WORKERS", "8")), thread_name_prefix="gap-analysis"
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load fonts and compile every template before taking traffic
+    try:
+        await asyncio.to_thread(warm_up_renderer)
+    except Exception as e:
+        print(f"⚠️ Typst warm-up failed, the first render will start cold: {e}")
+    if REFRESH_ENABLED:
+        profile_refresher.start()
+    yield
+    # Stop the job threads and Typst worker processes with the server
+    profile_refresher.shutdown()
+    job_manager.shutdown()
+    profile_store.shutdown()
+    analysis_executor.shutdown(wait=False, cancel_futures=True)
+    shutdown_engine()
+
+app = FastAPI(title="AI Resume Backend", lifespan=lifespan)
 
 # --- 2. CORS FIX ---
 app.add_middleware(
@@ -68,18 +135,39 @@ class ResumeRequest(BaseModel):
     jd_text: Optional[str] = None
     # NEW: Optional Pipeline Config
     pipeline: Optional[PipelineConfig] = None
+    # Seconds to wait for gap analysis before shipping the unranked PDF
+    analysis_deadline_s: Optional[float] = None
+    # "llm" (default), "fast" (local scorer, no LLM) or "hybrid"
+    analysis_mode: Literal["llm", "fast", "hybrid"] = "llm"
+
+class MultiResumeRequest(BaseModel):
+    username: str
+    profile_data: Dict[str, Any]
+    pipelines: List[PipelineConfig]
+    jd_text: Optional[str] = None
+    analysis_mode: Literal["llm", "fast", "hybrid"] = "llm"
+
+class BatchAnalysisRequest(BaseModel):
+    profile_data: Dict[str, Any]
+    jd_texts: List[str]
+    max_concurrency: int = 4
+    analysis_mode: Literal["llm", "fast", "hybrid"] = "llm"
 
 class RewriteRequest(BaseModel):
     text: str
     context: Optional[str] = "software engineering"
 
 # --- HELPER: PIPELINE LOGIC ---
-def apply_pipeline(profile: Dict[str, Any], config: PipelineConfig) -> Dict[str, Any]:
+def apply_pipeline(profile: Dict[str, Any], config: PipelineConfig,
+                   index_key: Optional[str] = None) -> Dict[str, Any]:
     """
     Applies the 'AI Agent' pipeline to transform the profile data.
     1. Filters projects based on tags.
     2. Filters experience (future).
     3. Reorders sections (future/typst-side).
+
+    Tag filtering goes through a per-profile inverted index (keyed on
+    index_key, usually the username) that is reused across pipeline runs.
     """
     logger.info(f"🤖 Applying Pipeline: {config.name}")
     modified_profile = profile.copy() # Shallow copy
@@ -87,26 +175,10 @@ def apply_pipeline(profile: Dict[str, Any], config: PipelineConfig) -> Dict[str,
     # 1. Filter Projects
     if config.include_tags or config.exclude_tags:
         original_projects = modified_profile.get("projects", [])
-        filtered_projects = []
-        
-        for project in original_projects:
-            tech_stack = [t.lower() for t in project.get("tech_stack", [])]
-            name = project.get("name", "").lower()
-            
-            # COMBINED CHECK: Check tech_stack AND name for tags
-            # (e.g. if tag is "react", match if "react" in tech_stack OR "react" in name)
-            project_keywords = tech_stack + name.split()
-            
-            # EXCLUDE LOGIC: If ANY exclude tag is found, skip
-            if any(tag.lower() in project_keywords for tag in config.exclude_tags):
-                continue
-            
-            # INCLUDE LOGIC: If include_tags are present, MUST have at least one
-            if config.include_tags:
-                if not any(tag.lower() in project_keywords for tag in config.include_tags):
-                    continue
-            
-            filtered_projects.append(project)
+        # COMBINED CHECK: tags match tech_stack entries AND words in the name
+        # (e.g. if tag is "react", match if "react" in tech_stack OR "react" in name)
+        index = get_project_index(index_key) if index_key else ProjectTagIndex()
+        filtered_projects = index.filter(original_projects, config.include_tags, config.exclude_tags)
         
         modified_profile["projects"] = filtered_projects
         logger.info(f"   Projects filtered: {len(original_projects)} -> {len(filtered_projects)}")
@@ -118,24 +190,43 @@ def apply_pipeline(profile: Dict[str, Any], config: PipelineConfig) -> Dict[str,
 def health_check():
     return {"status": "ok", "message": "AI Resume Agent is online"}
 
+@app.get("/metrics")
+def metrics():
+    """Runtime counters for the render path."""
+    return {
+        "compile": get_engine().stats(),
+        "render_cache": get_render_cache().stats(),
+        "analysis_cache": get_analysis_cache().stats(),
+        "jobs": job_manager.stats(),
+        "project_index": index_stats(),
+        "profiles": profile_store.stats(),
+        "github": get_github_client().stats(),
+        "profile_refresh": profile_refresher.stats(),
+        "rewrite_cache": get_rewrite_cache().stats(),
+        "builder_fragments": fragment_cache_stats(),
+    }
+
 @app.get("/profile/{username}")
 def get_profile(username: str):
     """
     Auto-Fetch Logic:
-    1. Look for local file.
+    1. Look in the profile store (memory, then data/github/).
+       Stale copies are served as-is and refreshed in the background.
     2. If missing, FETCH from GitHub API immediately.
     3. Save and return.
     """
-    file_path = os.path.join(project_root, "data", "github", f"{username}.json")
-    
     # 1. Check Local Cache
-    if os.path.exists(file_path):
-        print(f"📂 Loading cached profile for {username}")
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"⚠️ Cache corrupted, re-fetching: {e}")
+    try:
+        cached = profile_store.get(username)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"⚠️ Cache corrupted, re-fetching: {e}")
+        cached = None
+    if cached is not None:
+        if REFRESH_ENABLED:
+            profile_refresher.refresh_if_stale(username, cached)
+        return cached
 
     # 2. Fetch from GitHub (This is the magic part)
     print(f"🌍 User {username} not found locally. Fetching from GitHub...")
@@ -150,9 +241,7 @@ def get_profile(username: str):
             data_dict = profile_data.dict()
 
         # 3. Save to Disk (So next time it's instant)
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data_dict, f, indent=4)
+        profile_store.save(username, data_dict)
             
         print(f"✅ Successfully fetched and saved {username}")
         return data_dict
@@ -162,55 +251,434 @@ def get_profile(username: str):
         # Return 404 only if BOTH fail
         raise HTTPException(status_code=404, detail=f"User {username} not found on GitHub")
 
+def _rewrite_prompt(text: str) -> str:
+    return f"Rewrite these resume notes into professional XYZ bullets: '{text}'"
+
 @app.post("/rewrite")
 def rewrite_text(request: RewriteRequest):
     print(f"✨ Rewriting text...")
-    prompt = f"Rewrite these resume notes into professional XYZ bullets: '{request.text}'"
+    prompt = _rewrite_prompt(request.text)
     try:
-        response = llm.invoke(prompt)
-        return {"refined_text": response.content.strip()}
+        # Repeats are served from cache; concurrent duplicates share one call
+        refined = get_rewrite_cache().run(
+            rewrite_key(request.text, REWRITE_MODEL),
+            lambda: llm.invoke(prompt).content.strip(),
+        )
+        return {"refined_text": refined}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/generate")
-def generate_resume(request: ResumeRequest):
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/rewrite/stream")
+async def rewrite_text_stream(request: RewriteRequest, http_request: Request):
+    """
+    Same as /rewrite, but streams the rewrite as Server-Sent Events:
+    `token` events with each text chunk, then `done` with the full text
+    (or `error`). If the client disconnects, the model stream is closed
+    so the abandoned rewrite stops consuming quota.
+    Cached answers, and answers to an identical rewrite already in
+    flight, arrive as a single token.
+    """
+    prompt = _rewrite_prompt(request.text)
+    rewrite_cache = get_rewrite_cache()
+    key = rewrite_key(request.text, REWRITE_MODEL)
+
+    async def events():
+        cached, future, leader = rewrite_cache.begin(key)
+        if cached is None and not leader:
+            try:
+                cached = await asyncio.wrap_future(future)
+            except Exception:
+                # The call we were sharing failed or was abandoned: run our own
+                cached, future, leader = rewrite_cache.begin(key)
+        if cached is not None:
+            yield _sse("token", {"text": cached})
+            yield _sse("done", {"refined_text": cached})
+            return
+        if not leader:
+            # Someone else picked it up in the meantime
+            try:
+                text = await asyncio.wrap_future(future)
+            except Exception as e:
+                yield _sse("error", {"detail": str(e)})
+                return
+            yield _sse("token", {"text": text})
+            yield _sse("done", {"refined_text": text})
+            return
+
+        stream = llm.astream(prompt)
+        parts: List[str] = []
+        result: Optional[str] = None
+        error: Optional[BaseException] = None
+        try:
+            async for chunk in stream:
+                if await http_request.is_disconnected():
+                    print("🛑 Client disconnected, cancelling rewrite")
+                    error = ConnectionAbortedError("rewrite abandoned by client")
+                    return
+                text = chunk.content if isinstance(chunk.content, str) else ""
+                if text:
+                    parts.append(text)
+                    yield _sse("token", {"text": text})
+            result = "".join(parts).strip()
+            yield _sse("done", {"refined_text": result})
+        except asyncio.CancelledError:
+            print("🛑 Rewrite stream cancelled")
+            error = ConnectionAbortedError("rewrite cancelled")
+            raise
+        except Exception as e:
+            error = e
+            yield _sse("error", {"detail": str(e)})
+        finally:
+            # Closing the generator aborts the underlying model request
+            await stream.aclose()
+            if result is None and error is None:
+                error = ConnectionAbortedError("rewrite did not finish")
+            rewrite_cache.finish(key, future, text=result, error=error)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def _check_username(username: str):
+    """400 for names that can't be stored (e.g. '../x'), before any work is done."""
+    try:
+        validate_username(username)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _persist_profile(username: str, profile_data: Dict[str, Any]):
+    """
+    Queues the raw profile for a write-behind save to data/github/.
+    Nothing on the request path reads it back; rapid re-generates for the
+    same user collapse into one atomic write.
+    """
+    if not PERSIST_PROFILES:
+        return
+    if not profile_data.get("fetched_at"):
+        # Keep the fetch time so the refresher doesn't treat the edit as never fetched
+        stored = profile_store.get(username)
+        if stored and stored.get("fetched_at"):
+            profile_data = {**profile_data, "fetched_at": stored["fetched_at"]}
+    profile_store.save(username, profile_data, write_behind=True)
+
+def _record_metadata(username: str, jd_text: Optional[str], analysis: Dict[str, Any],
+                     pdf: Optional[bytes], template_id: str, compile_ms: Optional[float],
+                     render_key: Optional[str] = None):
+    """
+    Logs analyses and renders when the storage backend keeps them (SQLite).
+    Live renders are identified by their render cache key; `path` is only
+    set for PDF files on disk (see storage.migrate).
+    """
+    backend = profile_store.backend
+    if not hasattr(backend, "record_render"):
+        return
+    try:
+        if analysis and jd_text:
+            backend.record_analysis(username, jd_text, analysis)
+        if pdf is not None:
+            backend.record_render(username, len(pdf), render_key=render_key,
+                                  template_id=template_id, compile_ms=compile_ms)
+    except Exception as e:
+        print(f"⚠️ Could not record render metadata: {e}")
+
+def _safe_analyze(profile_data: Dict[str, Any], jd_text: str, mode: str = "llm") -> Dict[str, Any]:
+    try:
+        return analyze_job_match(profile_data, jd_text, mode=mode)
+    except Exception as e:
+        print(f"❌ Analyzer Error: {e}")
+        return {"match_score": 0, "critique": "Analysis failed.", "missing_critical_skills": []}
+
+def run_generation(request: ResumeRequest, job: Job, queue_timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    The /generate pipeline: persist -> filter -> analyze -> build -> compile.
+    Each step is timed on the job. On success the PDF is left on job.pdf;
+    compile errors are reported in the result instead of raised.
+
+    Gap analysis runs in the background while the unranked resume is built
+    and compiled. If it returns before the deadline and changes the project
+    order, the resume is rebuilt and recompiled; otherwise the unranked PDF
+    ships as-is. The rebuild reuses every cached fragment (only the project
+    order changes), but the recompile is a full Typst compile: Typst has no
+    way to lay out one section into an existing PDF.
+    """
     print(f"⚡ Generating resume for @{request.username}")
     
     # Save Data (Raw)
-    temp_path = os.path.join(project_root, "data", "github", f"{request.username}.json")
-    os.makedirs(os.path.dirname(temp_path), exist_ok=True)
-    with open(temp_path, "w", encoding="utf-8") as f:
-        json.dump(request.profile_data, f)
+    with job.stage("persist"):
+        _persist_profile(request.username, request.profile_data)
+
+    # Start Gap Analysis (in flight while we build)
+    # Note: analysis runs against the RAW profile; the pipeline is user-defined.
+    analysis_future = None
+    if request.jd_text and len(request.jd_text) > 10:
+        analysis_future = analysis_executor.submit(
+            _safe_analyze, request.profile_data, request.jd_text, request.analysis_mode
+        )
+    deadline_s = request.analysis_deadline_s if request.analysis_deadline_s is not None else ANALYSIS_DEADLINE_S
+    started = time.perf_counter()
 
     # Apply Pipeline (if present)
-    final_data = request.profile_data
-    if request.pipeline:
-        final_data = apply_pipeline(request.profile_data, request.pipeline)
+    with job.stage("pipeline"):
+        final_data = request.profile_data
+        if request.pipeline:
+            final_data = apply_pipeline(request.profile_data, request.pipeline, request.username)
 
-    # Gap Analysis
-    analysis = {}
-    if request.jd_text and len(request.jd_text) > 10:
-        try:
-            # Note: Analyze against RAW data or FILTERED data? 
-            # Probably RAW is better to see all potential, but let's stick to standard flow for now.
-            # Ideally analysis informs the pipeline, but here pipeline is user-defined.
-            analysis = analyze_job_match(temp_path, request.jd_text)
-        except Exception as e:
-            print(f"❌ Analyzer Error: {e}")
-            analysis = {"match_score": 0, "critique": "Analysis failed.", "missing_critical_skills": []}
-    
-    # Build PDF
+    # Build the document (unranked)
     # Pass final_data (filtered) instead of request.profile_data
-    typst_code = build_typst_code(final_data, analysis)
-    result = generate_resume_pdf.invoke({"typst_code": typst_code})
-    
+    with job.stage("build"):
+        template_id = request.pipeline.template_id if request.pipeline else "modern"
+        section_order = request.pipeline.section_order if request.pipeline else None
+        unranked_order = [p.get("name") for p in order_projects(final_data.get("projects", []))]
+        document = build_resume(final_data, template_id=template_id, section_order=section_order)
+
+    def compile_into_job(doc: ResumeDocument) -> Dict[str, Any]:
+        # CompileQueueFull propagates so callers can push back
+        try:
+            compiled = render_document(doc, queue_timeout=queue_timeout)
+        except CompileError as e:
+            print(f"❌ Compilation Failed: {e}")
+            return {"compile_ms": None, "compile_error": str(e), "cache_hit": False, "render_key": None}
+        job.pdf = compiled.pdf
+        return {"compile_ms": round(compiled.wall_ms, 1), "compile_error": None, "cache_hit": compiled.cache_hit,
+                "render_key": compiled.render_key}
+
+    # Speculative compile, unless the analysis already beat us to it
+    compile_info = None
+    if analysis_future is None or not analysis_future.done():
+        with job.stage("compile"):
+            compile_info = compile_into_job(document)
+
+    # Wait for the analysis (bounded by the deadline)
+    analysis = {}
+    analysis_timed_out = False
+    if analysis_future is not None:
+        with job.stage("analysis_wait"):
+            remaining = max(deadline_s - (time.perf_counter() - started), 0.0)
+            try:
+                analysis = analysis_future.result(timeout=remaining)
+            except FutureTimeoutError:
+                print(f"⏱️ Analysis missed the {deadline_s}s deadline; shipping unranked resume.")
+                analysis_timed_out = True
+
+    # Rebuild + full recompile, only if the ranking changed the project order
+    ranked_projects, unmatched_suggestions = rank_projects(final_data.get("projects", []), analysis)
+    ranked_order = [p.get("name") for p in ranked_projects]
+    if unmatched_suggestions:
+        print(f"⚠️ Suggested projects not found in profile: {unmatched_suggestions}")
+    if ranked_order != unranked_order:
+        with job.stage("rerender"):
+            ranked_document = build_resume(final_data, analysis, template_id=template_id,
+                                           section_order=section_order)
+            ranked_info = compile_into_job(ranked_document)
+        # Keep the speculative PDF if only the ranked one failed
+        if ranked_info["compile_error"] is None or compile_info is None or compile_info["compile_error"]:
+            document, compile_info = ranked_document, ranked_info
+    elif compile_info is None:
+        with job.stage("compile"):
+            compile_info = compile_into_job(document)
+
+    _record_metadata(request.username, request.jd_text, analysis, job.pdf,
+                     document.template_id, compile_info["compile_ms"], compile_info["render_key"])
+
     return {
         "status": "success",
-        "pdf_path": result,
+        **compile_info,
+        "analysis_timed_out": analysis_timed_out,
+        "timings_ms": dict(job.timings_ms),
         "analysis": analysis,
-        "typst_code": typst_code 
+        # Names in analysis.suggested_project_order that matched no project
+        "unmatched_suggestions": unmatched_suggestions,
+        "template_id": document.template_id,
+        "typst_code": document.source 
     }
 
+@app.post("/analyze/batch")
+def analyze_batch(request: BatchAnalysisRequest):
+    """
+    Scores one profile against many job descriptions.
+    Streams one NDJSON line per JD as soon as its analysis finishes:
+    {"index": <position in jd_texts>, "analysis": {...GapAnalysis...}}
+    """
+    # Parse + validate the profile once for the whole batch
+    try:
+        profile = UserProfile(**request.profile_data)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Invalid profile: {e}")
+    if not request.jd_texts:
+        raise HTTPException(status_code=400, detail="jd_texts must not be empty")
+
+    print(f"📦 Batch analysis: {len(request.jd_texts)} JDs for {profile.full_name}")
+
+    def stream():
+        for idx, analysis in analyze_job_matches(
+            profile, request.jd_texts, request.max_concurrency, request.analysis_mode
+        ):
+            yield json.dumps({"index": idx, "analysis": analysis}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.post("/generate")
+def generate_resume(request: ResumeRequest):
+    _check_username(request.username)
+    job = Job()
+    try:
+        result = run_generation(request, job)
+    except CompileQueueFull as e:
+        # Backpressure: tell the client to retry instead of piling up threads
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    if job.pdf is not None:
+        # Served from memory like async jobs and dropped with them after JOB_TTL_S,
+        # instead of piling up (publicly) in output/
+        job_manager.record(job, dict(result))
+        result["job_id"] = job.id
+        result["pdf_url"] = f"/jobs/{job.id}/result"
+    else:
+        result["pdf_path"] = f"Error: {result['compile_error']}"
+    return result
+
+@app.post("/generate/async", status_code=202)
+def generate_resume_async(request: ResumeRequest):
+    """
+    Queues a generation job and returns its id immediately.
+    Poll /jobs/{job_id} for progress and fetch the PDF from /jobs/{job_id}/result.
+    """
+    _check_username(request.username)
+    try:
+        # Off the request path we can afford to wait for a compile slot
+        job = job_manager.submit(lambda job: run_generation(request, job, queue_timeout=COMPILE_TIMEOUT_S))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "2"})
+
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+        "result_url": f"/jobs/{job.id}/result",
+    }
+
+def _variant_filename(position: int, name: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "variant"
+    return f"{position:02d}_{slug}.pdf"
+
+@app.post("/generate/multi")
+def generate_resume_variants(request: MultiResumeRequest):
+    """
+    Renders one resume per pipeline from a single profile.
+    The profile is persisted and analyzed once; each pipeline's filter and
+    build run in parallel and the PDFs compile concurrently on the worker
+    pool. Returns a zip of PDFs plus manifest.json with per-variant timings.
+    """
+    if not request.pipelines:
+        raise HTTPException(status_code=400, detail="pipelines must not be empty")
+    _check_username(request.username)
+
+    print(f"⚡ Generating {len(request.pipelines)} variants for @{request.username}")
+    job = Job("generate_multi")
+
+    with job.stage("persist"):
+        _persist_profile(request.username, request.profile_data)
+
+    # Shared analysis for every variant
+    analysis = {}
+    with job.stage("analysis"):
+        if request.jd_text and len(request.jd_text) > 10:
+            analysis = _safe_analyze(request.profile_data, request.jd_text, request.analysis_mode)
+
+    def render_variant(position: int, pipeline: PipelineConfig):
+        variant = Job(pipeline.name)
+        with variant.stage("pipeline"):
+            data = apply_pipeline(request.profile_data, pipeline, request.username)
+        with variant.stage("build"):
+            document = build_resume(data, analysis, template_id=pipeline.template_id,
+                                    section_order=pipeline.section_order)
+        entry = {
+            "name": pipeline.name,
+            "file": _variant_filename(position, pipeline.name),
+            "projects": len(data.get("projects", [])),
+            "template_id": document.template_id,
+            "compile_ms": None,
+            "cache_hit": False,
+            "error": None,
+        }
+        pdf = None
+        with variant.stage("compile"):
+            try:
+                compiled = render_document(document)
+            except CompileError as e:
+                print(f"❌ Variant '{pipeline.name}' failed to compile: {e}")
+                entry["error"] = str(e)
+            else:
+                pdf = compiled.pdf
+                entry["compile_ms"] = round(compiled.wall_ms, 1)
+                entry["cache_hit"] = compiled.cache_hit
+        entry["timings_ms"] = dict(variant.timings_ms)
+        return entry, pdf
+
+    with job.stage("variants"):
+        workers = min(len(request.pipelines), MULTI_MAX_PARALLEL)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="variant") as pool:
+            futures = [pool.submit(render_variant, i + 1, p) for i, p in enumerate(request.pipelines)]
+            try:
+                rendered = [f.result() for f in futures]
+            except CompileQueueFull as e:
+                raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    with job.stage("bundle"):
+        buffer = io.BytesIO()
+        # PDFs are already compressed; storing them keeps zipping cheap
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as bundle:
+            for entry, pdf in rendered:
+                if pdf is not None:
+                    bundle.writestr(entry["file"], pdf)
+            manifest = {
+                "username": request.username,
+                "analysis": analysis,
+                "variants": [entry for entry, _ in rendered],
+                "timings_ms": dict(job.timings_ms),
+            }
+            bundle.writestr("manifest.json", json.dumps(manifest, indent=2))
+
+    return Response(
+        content=buffer.getvalue(),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="resumes_{request.username}.zip"',
+            "X-Timings-Ms": json.dumps(job.timings_ms),
+        },
+    )
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != DONE:
+        # Not ready yet: same body as the status endpoint
+        return JSONResponse(status_code=202, content=job.to_dict())
+    if job.pdf is None:
+        raise HTTPException(status_code=422, detail=job.result.get("compile_error"))
+
+    return Response(
+        content=job.pdf,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'inline; filename="resume_{job.id}.pdf"'},
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,329 @@
+"""
+Storage backends for profiles and resume metadata.
+
+- JsonFileBackend: one JSON file per profile under data/github/ (default).
+- SQLiteBackend:   profiles, their projects, analyses and render metadata
+                   in indexed tables in data/resume.db (next to users.db).
+
+Pick one with PROFILE_BACKEND=json|sqlite. Everything reads and writes
+profiles through ProfileStore, which sits on top of the chosen backend.
+
+Migrate existing files into SQLite with:
+    python -m src.storage migrate [--dry-run]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import sqlite3
+import argparse
+import threading
+from typing import Dict, Any, List, Optional, Tuple, Hashable
+
+try:
+    from src.persistence import atomic_write_json
+except ModuleNotFoundError:
+    from persistence import atomic_write_json
+
+# ==================== CONFIG ====================
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+PROFILE_DIR = os.path.join(PROJECT_ROOT, "data", "github")
+DATABASE_PATH = os.path.join(PROJECT_ROOT, "data", "resume.db")
+PROFILE_BACKEND = os.getenv("PROFILE_BACKEND", "json")
+
+
+def validate_username(username: str) -> str:
+    if not username or username != os.path.basename(username) or username.startswith("."):
+        raise ValueError(f"Invalid profile name: {username!r}")
+    return username
+
+
+# ==================== JSON FILES ====================
+class JsonFileBackend:
+    """data/github/{username}.json; the signature is the file's (mtime, size)."""
+
+    name = "json"
+
+    def __init__(self, base_dir: str = PROFILE_DIR):
+        self.base_dir = base_dir
+
+    def location(self, username: str) -> str:
+        return os.path.join(self.base_dir, f"{validate_username(username)}.json")
+
+    def signature(self, username: str) -> Optional[Hashable]:
+        try:
+            st = os.stat(self.location(username))
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def read(self, username: str) -> Optional[Tuple[Dict[str, Any], Hashable]]:
+        signature = self.signature(username)
+        if signature is None:
+            return None
+        with open(self.location(username), "r", encoding="utf-8") as f:
+            return json.load(f), signature
+
+    def write(self, username: str, data: Dict[str, Any]):
+        atomic_write_json(self.location(username), data, indent=2)
+
+    def list_usernames(self) -> List[str]:
+        if not os.path.isdir(self.base_dir):
+            return []
+        return sorted(
+            name[:-5] for name in os.listdir(self.base_dir)
+            if name.endswith(".json") and not name.startswith(".")
+        )
+
+
+# ==================== SQLITE ====================
+class SQLiteBackend:
+    """
+    Profiles are stored whole (the JSON blob is what readers get back) and
+    projected into an indexed projects table for querying. The signature
+    is a per-profile version counter bumped on every write.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path: str = DATABASE_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._init_db()
+
+    # --- CONNECTIONS ---
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread, reused across calls."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS profiles (
+                username TEXT PRIMARY KEY,
+                full_name TEXT,
+                email TEXT,
+                bio TEXT,
+                data TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 1,
+                fetched_at REAL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS projects (
+                username TEXT NOT NULL REFERENCES profiles(username) ON DELETE CASCADE,
+                position INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                url TEXT,
+                stars INTEGER NOT NULL DEFAULT 0,
+                tech_stack TEXT NOT NULL DEFAULT '[]',
+                description TEXT,
+                is_refined INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (username, position)
+            );
+            CREATE INDEX IF NOT EXISTS idx_projects_name ON projects (name);
+            CREATE TABLE IF NOT EXISTS analyses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT,
+                jd_hash TEXT NOT NULL,
+                match_score INTEGER,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_analyses_user ON analyses (username, created_at);
+            CREATE INDEX IF NOT EXISTS idx_analyses_jd ON analyses (jd_hash);
+            CREATE TABLE IF NOT EXISTS renders (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT,
+                render_key TEXT,
+                template_id TEXT,
+                size_bytes INTEGER NOT NULL,
+                compile_ms REAL,
+                path TEXT,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_renders_user ON renders (username, created_at);
+            CREATE INDEX IF NOT EXISTS idx_renders_key ON renders (render_key);
+            -- One row per file on disk (NULL paths are never equal), so re-running
+            -- migrate doesn't duplicate renders; older databases keep their first copy
+            DELETE FROM renders WHERE path IS NOT NULL AND id NOT IN (
+                SELECT MIN(id) FROM renders WHERE path IS NOT NULL GROUP BY path
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_renders_path ON renders (path);
+        """)
+        conn.commit()
+
+    # --- PROFILES ---
+    def location(self, username: str) -> str:
+        return f"{self.db_path}#profiles/{validate_username(username)}"
+
+    def signature(self, username: str) -> Optional[Hashable]:
+        row = self._connect().execute(
+            "SELECT version FROM profiles WHERE username = ?", (username,)
+        ).fetchone()
+        return row["version"] if row else None
+
+    def read(self, username: str) -> Optional[Tuple[Dict[str, Any], Hashable]]:
+        row = self._connect().execute(
+            "SELECT data, version FROM profiles WHERE username = ?", (username,)
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row["data"]), row["version"]
+
+    def write(self, username: str, data: Dict[str, Any], fetched_at: Optional[float] = None):
+        validate_username(username)
+        if fetched_at is None:
+            fetched_at = data.get("fetched_at")
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO profiles (username, full_name, email, bio, data, version, fetched_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, 1, ?, ?)
+                ON CONFLICT(username) DO UPDATE SET
+                    full_name = excluded.full_name,
+                    email = excluded.email,
+                    bio = excluded.bio,
+                    data = excluded.data,
+                    version = profiles.version + 1,
+                    fetched_at = COALESCE(excluded.fetched_at, profiles.fetched_at),
+                    updated_at = excluded.updated_at
+                """,
+                (username, data.get("full_name"), data.get("email"), data.get("bio"),
+                 json.dumps(data), fetched_at, now),
+            )
+            conn.execute("DELETE FROM projects WHERE username = ?", (username,))
+            conn.executemany(
+                """
+                INSERT INTO projects (username, position, name, url, stars, tech_stack, description, is_refined)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (username, pos, p.get("name", ""), p.get("url"), p.get("stars") or 0,
+                     json.dumps(p.get("tech_stack") or []), p.get("description_raw"),
+                     int(bool(p.get("is_refined"))))
+                    for pos, p in enumerate(data.get("projects") or [])
+                ],
+            )
+
+    def list_usernames(self) -> List[str]:
+        rows = self._connect().execute("SELECT username FROM profiles ORDER BY username").fetchall()
+        return [r["username"] for r in rows]
+
+    def find_projects(self, tech: str) -> List[Dict[str, Any]]:
+        """Projects (across all profiles) whose tech_stack lists `tech`."""
+        rows = self._connect().execute(
+            """
+            SELECT p.username, p.name, p.url, p.stars, p.tech_stack
+            FROM projects p, json_each(p.tech_stack) t
+            WHERE lower(t.value) = lower(?)
+            ORDER BY p.stars DESC
+            """,
+            (tech,),
+        ).fetchall()
+        return [dict(r, tech_stack=json.loads(r["tech_stack"])) for r in rows]
+
+    # --- ANALYSES & RENDERS ---
+    def record_analysis(self, username: Optional[str], jd_text: str, result: Dict[str, Any]):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO analyses (username, jd_hash, match_score, result, created_at) VALUES (?, ?, ?, ?, ?)",
+                (username, hashlib.sha256(jd_text.encode("utf-8")).hexdigest(),
+                 result.get("match_score"), json.dumps(result), time.time()),
+            )
+
+    def record_render(self, username: Optional[str], size_bytes: int, render_key: Optional[str] = None,
+                      template_id: Optional[str] = None, compile_ms: Optional[float] = None,
+                      path: Optional[str] = None, created_at: Optional[float] = None) -> bool:
+        """False if a render with this path is already recorded."""
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                """
+                INSERT OR IGNORE INTO renders (username, render_key, template_id, size_bytes, compile_ms, path, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (username, render_key, template_id, size_bytes, compile_ms, path, created_at or time.time()),
+            )
+        return cursor.rowcount > 0
+
+
+# ==================== FACTORY ====================
+def create_backend(name: str = PROFILE_BACKEND):
+    if name == "sqlite":
+        return SQLiteBackend()
+    if name == "json":
+        return JsonFileBackend()
+    raise ValueError(f"Unknown PROFILE_BACKEND '{name}', expected 'json' or 'sqlite'")
+
+
+# ==================== MIGRATION ====================
+def migrate(dry_run: bool = False) -> Dict[str, int]:
+    """
+    Copies data/github/*.json profiles and the PDFs in output/ and
+    data/resumes/ into data/resume.db. Files are left in place and it is
+    safe to run again: PDFs already recorded are skipped.
+    """
+    counts = {"profiles": 0, "skipped": 0, "renders": 0, "known_renders": 0}
+    source = JsonFileBackend()
+    target = None if dry_run else SQLiteBackend()
+
+    for username in source.list_usernames():
+        try:
+            data, _ = source.read(username)
+        except Exception as e:
+            print(f"⚠️ Skipping {username}: {e}")
+            counts["skipped"] += 1
+            continue
+        if not isinstance(data, dict):
+            print(f"⚠️ Skipping {username}: not a profile object")
+            counts["skipped"] += 1
+            continue
+        if target is not None:
+            target.write(username, data)
+        counts["profiles"] += 1
+        print(f"   📄 {username} ({len(data.get('projects') or [])} projects)")
+
+    for folder in (os.path.join(PROJECT_ROOT, "output"), os.path.join(PROJECT_ROOT, "data", "resumes")):
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if not name.endswith(".pdf"):
+                continue
+            path = os.path.join(folder, name)
+            st = os.stat(path)
+            if target is not None and not target.record_render(
+                    None, st.st_size, path=os.path.relpath(path, PROJECT_ROOT), created_at=st.st_mtime):
+                counts["known_renders"] += 1
+                continue
+            counts["renders"] += 1
+
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resume storage tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate_cmd = sub.add_parser("migrate", help="Import data/github/*.json and rendered PDFs into SQLite")
+    migrate_cmd.add_argument("--dry-run", action="store_true", help="List what would be imported")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        print(f"🚚 Migrating into {DATABASE_PATH}{' (dry run)' if args.dry_run else ''}...")
+        result = migrate(dry_run=args.dry_run)
+        print(f"✅ Profiles: {result['profiles']} | Skipped: {result['skipped']} | Renders: {result['renders']} "
+              f"(already recorded: {result['known_renders']})")
+        if result["skipped"]:
+            sys.exit(1)
@@ -0,0 +1,148 @@
+"""
+Data-driven rendering through templates/*.typ.
+Instead of generating Typst source per request, the profile is turned
+into plain JSON and handed to templates/render.typ as sys.inputs; the
+driver imports the chosen template and calls its `resume(data)`.
+The template files never change between renders, so nothing has to be
+escaped and Typst can reuse its work on the unchanged template.
+
+RESUME_RENDER_MODE=source switches back to the f-string builder.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    from src.builder import build_typst_code, build_template_data
+except ModuleNotFoundError:
+    from builder import build_typst_code, build_template_data
+
+# ==================== CONFIG ====================
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+TEMPLATE_DIR = os.path.join(PROJECT_ROOT, "templates")
+DRIVER_FILE = "render.typ"
+DEFAULT_TEMPLATE = "modern"
+RENDER_MODE = os.getenv("RESUME_RENDER_MODE", "template")  # template | source
+
+# Compiled by every Typst worker at startup (see typst_engine.warm_up)
+WARM_UP_PROFILE: Dict[str, Any] = {
+    "full_name": "Warm Up",
+    "github_username": "warm-up",
+    "email": "warm.up@example.com",
+    "bio": "Sample profile compiled at startup.",
+    "projects": [
+        {"name": "Sample Project", "tech_stack": ["Python", "Typst"],
+         "description_raw": "Warm-up project.", "refined_bullets": ["Loads fonts *before* the first request."]},
+    ],
+}
+
+_fingerprints: Dict[str, Tuple[Tuple, str]] = {}  # template_id -> (file stats, hash)
+_lock = threading.Lock()
+
+
+def available_templates() -> List[str]:
+    """Template ids: every templates/*.typ except the driver."""
+    if not os.path.isdir(TEMPLATE_DIR):
+        return []
+    return sorted(
+        name[:-4] for name in os.listdir(TEMPLATE_DIR)
+        if name.endswith(".typ") and name != DRIVER_FILE
+    )
+
+
+def resolve_template(template_id: Optional[str]) -> str:
+    """The requested template if it exists, else the default."""
+    if template_id and template_id in available_templates():
+        return template_id
+    if template_id and template_id != DEFAULT_TEMPLATE:
+        print(f"⚠️ Unknown template '{template_id}', using '{DEFAULT_TEMPLATE}'")
+    return DEFAULT_TEMPLATE
+
+
+def _template_files(template_id: str) -> List[str]:
+    return [os.path.join(TEMPLATE_DIR, DRIVER_FILE), os.path.join(TEMPLATE_DIR, f"{template_id}.typ")]
+
+
+def template_fingerprint(template_id: str) -> str:
+    """Hash of the driver + template sources; re-read only when a file changes."""
+    files = _template_files(template_id)
+    stats = tuple((os.stat(f).st_mtime_ns, os.stat(f).st_size) for f in files)
+    with _lock:
+        cached = _fingerprints.get(template_id)
+        if cached is not None and cached[0] == stats:
+            return cached[1]
+    h = hashlib.sha256()
+    for path in files:
+        with open(path, "rb") as f:
+            h.update(f.read())
+        h.update(b"\0")
+    digest = h.hexdigest()
+    with _lock:
+        _fingerprints[template_id] = (stats, digest)
+    return digest
+
+
+def template_inputs(data: Dict[str, Any], template_id: str) -> Dict[str, str]:
+    """sys.inputs for render.typ (values must be strings)."""
+    return {
+        "resume": json.dumps(data, ensure_ascii=False, sort_keys=True),
+        "template": template_id,
+    }
+
+
+def template_source(data: Dict[str, Any], template_id: str) -> str:
+    """
+    A readable stand-in for the generated source (shown in the editor):
+    the template itself, followed by the call the driver makes.
+    """
+    with open(os.path.join(TEMPLATE_DIR, f"{template_id}.typ"), "r", encoding="utf-8") as f:
+        source = f.read()
+    return (
+        f"{source.rstrip()}\n\n"
+        f"// Rendered by templates/{DRIVER_FILE} with sys.inputs.resume =\n"
+        f"// {json.dumps(data, ensure_ascii=False)}\n"
+        f"#resume(json(bytes(sys.inputs.resume)))\n"
+    )
+
+
+def warm_up_jobs() -> List[Tuple[Any, Optional[str], Dict[str, str]]]:
+    """The builder's source plus every template, rendered with WARM_UP_PROFILE."""
+    data = build_template_data(WARM_UP_PROFILE, None)
+    driver = os.path.join(TEMPLATE_DIR, DRIVER_FILE)
+    jobs: List[Tuple[Any, Optional[str], Dict[str, str]]] = [
+        (build_typst_code(WARM_UP_PROFILE, None).encode("utf-8"), None, {})
+    ]
+    if os.path.exists(driver):
+        jobs += [(driver, TEMPLATE_DIR, template_inputs(data, t)) for t in available_templates()]
+    return jobs
+
+
+# ==================== DOCUMENTS ====================
+@dataclass
+class ResumeDocument:
+    """What gets compiled: template data (template mode) or Typst source (source mode)."""
+    template_id: str
+    data: Optional[Dict[str, Any]] = None
+    typst_code: Optional[str] = None
+
+    @property
+    def source(self) -> str:
+        """Typst source for display."""
+        if self.typst_code is not None:
+            return self.typst_code
+        return template_source(self.data, self.template_id)
+
+
+def build_resume(profile: Dict[str, Any], analysis: Optional[Dict[str, Any]] = None,
+                 template_id: Optional[str] = None, section_order: Optional[List[str]] = None,
+                 mode: str = RENDER_MODE) -> ResumeDocument:
+    """Sections follow `section_order` (a pipeline's), else builder.SECTION_ORDER."""
+    if mode == "source":
+        code = build_typst_code(profile, analysis, section_order=section_order)
+        return ResumeDocument(template_id or DEFAULT_TEMPLATE, typst_code=code)
+    template_id = resolve_template(template_id)
+    return ResumeDocument(template_id, data=build_template_data(profile, analysis, section_order))
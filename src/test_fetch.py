@@ -1,12 +1,12 @@
 import os
 import sys
-import json
 
 # Ensure we can import from src
 sys.path.append(os.getcwd())
 
 try:
     from src.fetch_github import fetch_github_profile
+    from src.profile_store import get_profile_store
 except ImportError:
     print("❌ Could not import 'fetch_github_data'. Check your file structure.")
     sys.exit(1)
@@ -29,15 +29,12 @@ try:
         print(f"   -> First Project: {p1.name} ({p1.stars} stars)")
 
     # 4. Save to disk (Simulate what server does)
-    save_path = f"data/github/{username}.json"
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    
-    with open(save_path, "w") as f:
-        # Handle Pydantic v2 serialization
-        data_dict = user_profile.model_dump() if hasattr(user_profile, "model_dump") else user_profile.dict()
-        json.dump(data_dict, f, indent=4)
+    store = get_profile_store()
+    # Handle Pydantic v2 serialization
+    data_dict = user_profile.model_dump() if hasattr(user_profile, "model_dump") else user_profile.dict()
+    store.save(username, data_dict)
         
-    print(f"\n💾 File successfully saved to: {os.path.abspath(save_path)}")
+    print(f"\n💾 File successfully saved to: {store.location(username)}")
 
 except Exception as e:
     print(f"\n❌ ERROR: {e}")
@@ -1,7 +1,25 @@
 import os
-import typst  # <--- Make sure you ran: uv add typst
+import copy
+import time
+import tempfile
+import dataclasses
 from langchain_core.tools import tool
-import json
+from typing import Optional
+
+try:
+    from src.typst_engine import get_engine, CompileResult, WARM_UP
+    from src.render_cache import get_render_cache, render_key
+    from src.profile_store import get_profile_store
+    from src.template_renderer import (
+        ResumeDocument, TEMPLATE_DIR, DRIVER_FILE, template_fingerprint, template_inputs, warm_up_jobs,
+    )
+except ModuleNotFoundError:
+    from typst_engine import get_engine, CompileResult, WARM_UP
+    from render_cache import get_render_cache, render_key
+    from profile_store import get_profile_store
+    from template_renderer import (
+        ResumeDocument, TEMPLATE_DIR, DRIVER_FILE, template_fingerprint, template_inputs, warm_up_jobs,
+    )
 
 # --- Helper: Find Project Root ---
 def get_project_root():
@@ -10,6 +28,89 @@ def get_project_root():
     src_folder = os.path.dirname(current_script_path)
     return os.path.dirname(src_folder)
 
+def render_pdf(typst_code: str, template_id: str = "modern",
+               queue_timeout: Optional[float] = None) -> CompileResult:
+    """
+    Compiles Typst source in memory on the shared worker pool.
+    No .typ file is written, so concurrent renders can't clobber each other.
+    Byte-identical sources are served from the render cache.
+    """
+    start = time.perf_counter()
+    cache = get_render_cache()
+    key = render_key(typst_code, template_id)
+
+    pdf = cache.get(key)
+    if pdf is not None:
+        lookup_ms = (time.perf_counter() - start) * 1000
+        return CompileResult(pdf=pdf, wall_ms=lookup_ms, compile_ms=0.0, queue_ms=0.0, cache_hit=True,
+                             render_key=key)
+
+    engine = get_engine()
+    if queue_timeout is None:
+        result = engine.compile(typst_code)
+    else:
+        result = engine.compile(typst_code, queue_timeout=queue_timeout)
+    cache.put(key, result.pdf)
+    return dataclasses.replace(result, render_key=key)
+
+def render_template(data: dict, template_id: str = "modern",
+                    queue_timeout: Optional[float] = None) -> CompileResult:
+    """
+    Renders templates/{template_id}.typ with `data` passed as sys.inputs.
+    Cached on the data plus the template sources, so editing a template
+    invalidates its renders.
+    """
+    start = time.perf_counter()
+    cache = get_render_cache()
+    inputs = template_inputs(data, template_id)
+    key = render_key(template_fingerprint(template_id) + inputs["resume"], template_id)
+
+    pdf = cache.get(key)
+    if pdf is not None:
+        lookup_ms = (time.perf_counter() - start) * 1000
+        return CompileResult(pdf=pdf, wall_ms=lookup_ms, compile_ms=0.0, queue_ms=0.0, cache_hit=True,
+                             render_key=key)
+
+    kwargs = {} if queue_timeout is None else {"queue_timeout": queue_timeout}
+    result = get_engine().compile_file(os.path.join(TEMPLATE_DIR, DRIVER_FILE), TEMPLATE_DIR, inputs, **kwargs)
+    cache.put(key, result.pdf)
+    return dataclasses.replace(result, render_key=key)
+
+def render_document(doc: ResumeDocument, queue_timeout: Optional[float] = None) -> CompileResult:
+    if doc.typst_code is not None:
+        return render_pdf(doc.typst_code, doc.template_id, queue_timeout=queue_timeout)
+    return render_template(doc.data, doc.template_id, queue_timeout=queue_timeout)
+
+def warm_up_renderer() -> Optional[float]:
+    """
+    Starts the Typst workers and compiles the builder and every template
+    once, so the first /generate doesn't pay the cold start.
+    Returns the warm-up time in ms (None if disabled via TYPST_WARM_UP=0).
+    """
+    if not WARM_UP:
+        return None
+    return get_engine().warm_up(warm_up_jobs())
+
+def write_pdf(pdf: bytes, filename: str = "resume.pdf") -> str:
+    """
+    Atomically writes PDF bytes into 'output/' and returns the final path.
+    Readers of /static never see a half-written file.
+    """
+    output_dir = os.path.join(get_project_root(), "output")
+    os.makedirs(output_dir, exist_ok=True)
+
+    pdf_path = os.path.join(output_dir, filename)
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix=".pdf.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf)
+        os.replace(tmp_path, pdf_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return pdf_path
+
 @tool
 def generate_resume_pdf(typst_code: str):
     """
@@ -17,26 +118,12 @@ def generate_resume_pdf(typst_code: str):
     Saves the output to 'output/resume.pdf'.
     """
     print(f"\n[DEBUG] 🚀 Tool Triggered! Compiling PDF locally...")
-    
-    # 1. Setup Paths
-    project_root = get_project_root()
-    output_dir = os.path.join(project_root, "output")
-    os.makedirs(output_dir, exist_ok=True)
-    
-    pdf_path = os.path.join(output_dir, "resume.pdf")
-    temp_typ_path = os.path.join(output_dir, "temp_resume.typ")
 
-    # 2. Write the Typst code to a temporary file
     try:
-        with open(temp_typ_path, "w", encoding="utf-8") as f:
-            f.write(typst_code)
-            
-        print(f"📄 Saved Typst code to: {temp_typ_path}")
+        result = render_pdf(typst_code)
+        pdf_path = write_pdf(result.pdf)
 
-        # 3. Compile using Local Typst Library (No Docker needed!)
-        typst.compile(temp_typ_path, output=pdf_path)
-        
-        print(f"✅ PDF compiled successfully: {pdf_path}")
+        print(f"✅ PDF compiled successfully in {result.wall_ms:.0f}ms: {pdf_path}")
         return f"Saved to {pdf_path}"
 
     except Exception as e:
@@ -49,17 +136,11 @@ def save_refined_profile(profile_data: dict, filename: str):
     Saves the updated profile data back to disk.
     """
     try:
-        project_root = get_project_root()
-        # Ensure we are saving to data/github/ regardless of input
-        if "github" not in filename:
-             filename = f"github/{filename}"
-             
-        file_path = os.path.join(project_root, "data", filename)
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(profile_data, f, indent=2)
+        # Always lands in data/github/ via the profile store, whatever the input path
+        username = os.path.splitext(os.path.basename(filename))[0]
+        # Copy: callers (e.g. the LangGraph agent) keep editing their dict
+        get_profile_store().save(username, copy.deepcopy(profile_data))
             
         return "Saved successfully."
     except Exception as e:
-        return f"Error saving profile: {e}"
\ No newline at end of file
+        return f"Error saving profile: {e}"
@@ -0,0 +1,288 @@
+"""
+Typst compile engine.
+Runs typst.compile in a bounded pool of worker processes so concurrent
+renders scale with cores instead of serializing on the request thread.
+Sources are compiled from memory (or, for data-driven templates, from
+a template file plus sys.inputs) and the PDF comes back as bytes.
+
+Each worker keeps long-lived typst.Compiler instances: fonts are loaded
+once when the process starts (system fonts plus TYPST_FONT_PATHS) and
+Typst's incremental caches survive between compiles. warm_up() spawns
+the workers and compiles sample documents before the first request.
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple, Callable, Union
+
+# ==================== CONFIG ====================
+MAX_WORKERS = int(os.getenv("TYPST_WORKERS", str(os.cpu_count() or 2)))
+# Jobs allowed in flight (running + queued) before callers are pushed back
+MAX_PENDING = int(os.getenv("TYPST_MAX_PENDING", str(MAX_WORKERS * 4)))
+# How long a caller waits for a free slot before we give up
+QUEUE_TIMEOUT_S = float(os.getenv("TYPST_QUEUE_TIMEOUT", "5"))
+COMPILE_TIMEOUT_S = float(os.getenv("TYPST_COMPILE_TIMEOUT", "30"))
+# Extra font directories (os.pathsep-separated), loaded once per worker
+FONT_PATHS: List[str] = [p for p in os.getenv("TYPST_FONT_PATHS", "").split(os.pathsep) if p]
+IGNORE_SYSTEM_FONTS = os.getenv("TYPST_IGNORE_SYSTEM_FONTS", "0") == "1"
+WARM_UP = os.getenv("TYPST_WARM_UP", "1") != "0"
+
+# (input, root, sys_inputs): bytes source with root None, or a file path under root
+WarmUpJob = Tuple[Union[bytes, str], Optional[str], Dict[str, str]]
+
+
+# ==================== ERRORS ====================
+class CompileError(Exception):
+    """Typst rejected the source (or the worker died while compiling it)."""
+
+
+class CompileQueueFull(Exception):
+    """Backpressure: too many compiles are already queued."""
+
+
+# ==================== RESULT ====================
+@dataclass
+class CompileResult:
+    pdf: bytes
+    wall_ms: float     # submit -> result, as seen by the caller
+    compile_ms: float  # time spent inside typst.compile
+    queue_ms: float    # wall time not spent compiling (waiting + IPC)
+    cache_hit: bool = False
+    render_key: Optional[str] = None  # render cache key, set by tools.render_*
+
+
+# ==================== WORKER ====================
+# Per-process state, set up by _init_worker
+_fonts = None
+_compilers: Dict[Optional[str], Any] = {}  # project root -> typst.Compiler
+
+
+def _compiler(root: Optional[str] = None):
+    """The process's compiler for `root`, created on first use with the shared font set."""
+    global _fonts
+    compiler = _compilers.get(root)
+    if compiler is None:
+        import typst
+
+        if _fonts is None:
+            _fonts = typst.Fonts(include_system_fonts=not IGNORE_SYSTEM_FONTS, font_paths=FONT_PATHS)
+        compiler = typst.Compiler(root=root, font_paths=_fonts)
+        _compilers[root] = compiler
+    return compiler
+
+
+def _compile(source: Union[bytes, str], root: Optional[str], sys_inputs: Dict[str, str]) -> Tuple[bytes, float]:
+    start = time.perf_counter()
+    try:
+        # None clears sys.inputs left over from the previous compile
+        pdf = _compiler(root).compile(input=source, sys_inputs=sys_inputs or None)
+    except Exception as e:
+        # Typst's own exception types don't always survive pickling
+        raise CompileError(str(e)) from None
+    return pdf, (time.perf_counter() - start) * 1000
+
+
+def _init_worker(warm_up_jobs: List[WarmUpJob]):
+    """Pool initializer: load fonts once, then compile the warm-up documents."""
+    global _fonts
+    # Forked workers must not reuse the parent's compilers
+    _fonts = None
+    _compilers.clear()
+    _compiler()
+    for source, root, sys_inputs in warm_up_jobs:
+        try:
+            _compile(source, root, sys_inputs)
+        except CompileError as e:
+            print(f"⚠️ Typst warm-up compile failed (pid {os.getpid()}): {e}")
+
+
+def _ping():
+    """No-op task; submitting one makes the pool start a worker."""
+
+
+def _compile_worker(source: bytes) -> Tuple[bytes, float]:
+    """Runs inside a pool process. Must stay top-level so it can be pickled."""
+    return _compile(source, None, {})
+
+
+def _compile_file_worker(main_path: str, root: str, sys_inputs: Dict[str, str]) -> Tuple[bytes, float]:
+    """Compiles a .typ file on disk with string inputs exposed as sys.inputs."""
+    return _compile(main_path, root, sys_inputs)
+
+
+# ==================== ENGINE ====================
+class CompileEngine:
+    def __init__(self, max_workers: int = MAX_WORKERS, max_pending: int = MAX_PENDING):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._warm_up_jobs: List[WarmUpJob] = []
+        self._warm_up_ms: Optional[float] = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_wall_ms = 0.0
+        self._max_wall_ms = 0.0
+        self._last_wall_ms = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Replacement pools (after a crash) are warmed the same way
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_worker,
+                    initargs=(self._warm_up_jobs,),
+                )
+            return self._executor
+
+    def _reset_executor(self):
+        """A crashed worker breaks the whole pool; replace it."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def warm_up(self, jobs: List[WarmUpJob], timeout: float = COMPILE_TIMEOUT_S) -> float:
+        """
+        Starts every worker and has each compile `jobs` before it takes
+        real work, so the first request doesn't pay for font loading and
+        a cold compile. Call before the first compile; returns wall ms.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            self._warm_up_jobs = list(jobs)
+        executor = self._get_executor()
+        # One task per worker makes the pool spawn all of them; each runs
+        # the initializer (fonts + warm-up compiles) before answering
+        try:
+            for future in [executor.submit(_ping) for _ in range(self.max_workers)]:
+                future.result(timeout=timeout)
+        except BrokenProcessPool:
+            self._reset_executor()
+            raise
+        wall_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._warm_up_ms = wall_ms
+        print(f"🔥 Typst warm-up: {self.max_workers} worker(s), {len(jobs)} document(s) in {wall_ms:.0f}ms")
+        return wall_ms
+
+    def _finish(self, wall_ms: Optional[float]):
+        with self._lock:
+            self._pending -= 1
+            if wall_ms is None:
+                self._failed += 1
+            else:
+                self._completed += 1
+                self._total_wall_ms += wall_ms
+                self._last_wall_ms = wall_ms
+                self._max_wall_ms = max(self._max_wall_ms, wall_ms)
+        self._slots.release()
+
+    def compile(self, source: str, queue_timeout: float = QUEUE_TIMEOUT_S,
+                timeout: float = COMPILE_TIMEOUT_S) -> CompileResult:
+        """
+        Compiles Typst source to PDF bytes on the worker pool.
+        Raises CompileQueueFull if no slot frees up within queue_timeout.
+        """
+        return self._run(_compile_worker, (source.encode("utf-8"),), queue_timeout, timeout)
+
+    def compile_file(self, main_path: str, root: str, sys_inputs: Dict[str, str],
+                     queue_timeout: float = QUEUE_TIMEOUT_S,
+                     timeout: float = COMPILE_TIMEOUT_S) -> CompileResult:
+        """Same as compile(), for a file on disk rendered with sys.inputs."""
+        return self._run(_compile_file_worker, (main_path, root, sys_inputs), queue_timeout, timeout)
+
+    def _run(self, worker: Callable, args: tuple, queue_timeout: float, timeout: float) -> CompileResult:
+        if not self._slots.acquire(timeout=queue_timeout):
+            with self._lock:
+                self._rejected += 1
+            raise CompileQueueFull(
+                f"Typst compile queue is full ({self.max_pending} jobs in flight)"
+            )
+
+        with self._lock:
+            self._pending += 1
+
+        start = time.perf_counter()
+        wall_ms = None
+        timed_out = None
+        try:
+            future = self._get_executor().submit(worker, *args)
+            pdf, compile_ms = future.result(timeout=timeout)
+            wall_ms = (time.perf_counter() - start) * 1000
+        except BrokenProcessPool as e:
+            self._reset_executor()
+            raise CompileError(f"Typst worker crashed: {e}") from e
+        except FutureTimeoutError as e:
+            # cancel() only drops jobs still queued; a running compile can't be
+            # interrupted, so its slot stays taken until the worker is free again
+            future.cancel()
+            timed_out = future
+            raise CompileError(f"Typst compile timed out after {timeout}s") from e
+        finally:
+            if timed_out is not None:
+                timed_out.add_done_callback(lambda _: self._finish(None))
+            else:
+                self._finish(wall_ms)
+
+        return CompileResult(
+            pdf=pdf,
+            wall_ms=wall_ms,
+            compile_ms=compile_ms,
+            queue_ms=max(wall_ms - compile_ms, 0.0),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "queue_depth": self._pending,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wall_ms": round(self._total_wall_ms / self._completed, 2) if self._completed else 0.0,
+                "max_wall_ms": round(self._max_wall_ms, 2),
+                "last_wall_ms": round(self._last_wall_ms, 2),
+                "font_paths": FONT_PATHS,
+                "warm_up_ms": round(self._warm_up_ms, 2) if self._warm_up_ms is not None else None,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+# ==================== SHARED INSTANCE ====================
+_engine: Optional[CompileEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> CompileEngine:
+    """Returns the process-wide engine, creating it on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = CompileEngine()
+        return _engine
+
+
+def shutdown_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.shutdown()
+        _engine = None
@@ -1,7 +1,7 @@
 // templates/classic.typ
 
 #let resume(data) = {
-  set page(margin: (x: 2cm, y: 2cm))
+  set page(paper: "us-letter", margin: (x: 2cm, y: 2cm))
   set text(font: "New Computer Modern", size: 10pt) // Traditional Serif Font
 
   // --- CLASSIC CENTERED HEADER ---
@@ -12,31 +12,78 @@
     #line(length: 100%, stroke: 0.5pt + black)
   ]
 
-  // --- SUMMARY ---
-  if data.bio != "" [
+  // Centered section title with a rule underneath
+  let section_title(title) = [
     #v(1em)
-    #align(center)[*Summary*]
-    #align(center)[#data.bio]
+    #align(center)[*#title*]
+    #line(length: 100%, stroke: 0.5pt + gray)
   ]
 
-  // --- PROJECTS ---
-  if data.projects != none and data.projects.len() > 0 [
-    #v(1em)
-    #align(center)[*Professional Projects*]
-    #line(length: 100%, stroke: 0.5pt + gray)
-    
-    #for p in data.projects [
-      #block(below: 1em)[
-        #grid(
-          columns: (1fr, auto),
-          text(weight: "bold", size: 11pt)[#p.name],
-          text(style: "italic")[#p.tech]
-        )
-        // Bullets with a different marker
-        #for point in p.bullets [
-          #h(1em) $circ$ #point \
+  // --- SECTIONS (each renders nothing when it has no data) ---
+  let sections = (
+    summary: () => if data.bio != "" [
+      #v(1em)
+      #align(center)[*Summary*]
+      #align(center)[#data.bio]
+    ],
+
+    experience: () => if data.experience.len() > 0 [
+      #section_title("Professional Experience")
+      #for job in data.experience [
+        #block(below: 1em)[
+          #grid(
+            columns: (1fr, auto),
+            text(weight: "bold", size: 11pt)[#job.company],
+            text(style: "italic")[#job.dates]
+          )
+          #text(style: "italic")[#job.role] \
+          #for point in job.bullets [
+            #h(1em) $compose$ #point \
+          ]
         ]
       ]
-    ]
-  ]
-}
\ No newline at end of file
+    ],
+
+    projects: () => if data.projects != none and data.projects.len() > 0 [
+      #section_title("Professional Projects")
+      #for p in data.projects [
+        #block(below: 1em)[
+          #grid(
+            columns: (1fr, auto),
+            text(weight: "bold", size: 11pt)[#p.name],
+            text(style: "italic")[#p.tech]
+          )
+          // Bullets with a different marker
+          #for point in p.bullets [
+            #h(1em) $compose$ #point \
+          ]
+        ]
+      ]
+    ],
+
+    education: () => if data.education.len() > 0 [
+      #section_title("Education")
+      #for school in data.education [
+        #block(below: 1em)[
+          #grid(
+            columns: (1fr, auto),
+            text(weight: "bold", size: 11pt)[#school.institution],
+            text(style: "italic")[#school.dates]
+          )
+          #school.degree
+          #if school.details != "" [ \ #school.details ]
+        ]
+      ]
+    ],
+
+    skills: () => if data.skills.len() > 0 [
+      #section_title("Skills")
+      #align(center)[#data.skills.join(" · ")]
+    ],
+  )
+
+  // --- LAYOUT (the pipeline's section_order) ---
+  for name in data.at("sections", default: ("summary", "projects")) {
+    sections.at(name, default: () => none)()
+  }
+}
@@ -1,8 +1,8 @@
 // templates/modern.typ
 
 #let resume(data) = {
-  set page(margin: (x: 1.5cm, y: 1.5cm))
-  set text(font: "Linux Libertine", size: 11pt)
+  set page(paper: "us-letter", margin: (x: 1.5cm, y: 1.5cm))
+  set text(font: "Libertinus Serif", size: 11pt)
 
   // --- HEADER ---
   align(center)[
@@ -11,27 +11,70 @@
     #line(length: 100%, stroke: 1pt + gray)
   ]
 
-  // --- SUMMARY ---
-  if data.bio != "" [
-    == Summary
-    #data.bio
-  ]
+  // --- SECTIONS (each renders nothing when it has no data) ---
+  let sections = (
+    summary: () => if data.bio != "" [
+      == Summary
+      #data.bio
+    ],
 
-  // --- PROJECTS ---
-  if data.projects != none and data.projects.len() > 0 [
-    == Projects
-    #for p in data.projects [
-      #block(below: 1em)[
-        #grid(
-          columns: (1fr, auto),
-          [*#p.name*],
-          text(style: "italic")[#p.tech]
-        )
-        // Handle bullets safely inside Typst
-        #for point in p.bullets [
-          - #point
+    experience: () => if data.experience.len() > 0 [
+      == Experience
+      #for job in data.experience [
+        #block(below: 1em)[
+          #grid(
+            columns: (1fr, auto),
+            [*#job.company*],
+            [#job.dates]
+          )
+          #text(style: "italic")[#job.role]
+          #for point in job.bullets [
+            - #point
+          ]
         ]
       ]
-    ]
-  ]
-}
\ No newline at end of file
+    ],
+
+    projects: () => if data.projects != none and data.projects.len() > 0 [
+      == Projects
+      #for p in data.projects [
+        #block(below: 1em)[
+          #grid(
+            columns: (1fr, auto),
+            [*#p.name*],
+            text(style: "italic")[#p.tech]
+          )
+          // Handle bullets safely inside Typst
+          #for point in p.bullets [
+            - #point
+          ]
+        ]
+      ]
+    ],
+
+    education: () => if data.education.len() > 0 [
+      == Education
+      #for school in data.education [
+        #block(below: 1em)[
+          #grid(
+            columns: (1fr, auto),
+            [*#school.institution*],
+            [#school.dates]
+          )
+          #school.degree
+          #if school.details != "" [ \ #text(style: "italic")[#school.details] ]
+        ]
+      ]
+    ],
+
+    skills: () => if data.skills.len() > 0 [
+      == Skills
+      #data.skills.join(", ")
+    ],
+  )
+
+  // --- LAYOUT (the pipeline's section_order) ---
+  for name in data.at("sections", default: ("summary", "projects")) {
+    sections.at(name, default: () => none)()
+  }
+}
@@ -0,0 +1,17 @@
+// templates/render.typ
+// Entry point for data-driven rendering (see src/template_renderer.py).
+// The profile arrives as JSON in sys.inputs.resume and the template is
+// picked by name from sys.inputs.template. Register new templates here.
+
+#import "modern.typ" as modern
+#import "classic.typ" as classic
+
+#let templates = (
+  modern: modern.resume,
+  classic: classic.resume,
+)
+
+#let data = json(bytes(sys.inputs.resume))
+#let resume = templates.at(sys.inputs.at("template", default: "modern"), default: modern.resume)
+
+#resume(data)